@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+'''
+Compare oschema.jsonnet hier() and sort_select() in pure Jsonnet and
+with the moo native Python callbacks on a synthetic schema.
+
+    python bench/bench_jsonnet_natives.py [count ...]
+
+The pure Jsonnet versions exceed the Jsonnet stack for some hundreds
+of types.
+'''
+import sys
+import json
+import time
+import moo.cache
+import moo.jsonnet
+
+code = '''
+local os = import "oschema.jsonnet";
+local n = std.parseInt(std.extVar("n"));
+local path(i) = "top.p" + (i % 7) + ".q" + (i % 3);
+local name(i) = if i < 5 || i % 2 == 1 then "N" + i else "R" + i;
+local ref(i) = {path: std.split(path(i), "."), name: name(i)};
+local pick(i, s) = ((i * i * 31 + s) % 1000003) % i;
+local ty(i) = if i < 5 || i % 2 == 1
+  then os.schema(path(i)).number(name(i), "i4")
+  else os.schema(path(i)).record(name(i), [os.field("a", ref(pick(i, 17))),
+                                           os.field("b", ref(pick(i, 5)))]);
+local types = [ty(i) for i in std.range(0, n - 1)];
+'''
+
+parts = dict(types='types',
+             hier='os.hier(types)',
+             sort='os.sort_select(types)')
+
+
+def evaluate(text, count, native):
+    'Return seconds to evaluate text or error message'
+    ext_vars = dict(n=str(count))
+    t0 = time.perf_counter()
+    try:
+        if native:
+            moo.jsonnet.loads(text, ext_vars=ext_vars)
+        else:
+            moo.jsonnet.evaluate_snippet("<bench>", text, ext_vars=ext_vars,
+                                         import_callback=moo.jsonnet.ImportCallback())
+    except RuntimeError as err:
+        return str(err).split("\n")[0]
+    return f'{time.perf_counter() - t0:.2f} s'
+
+
+def main(*counts):
+    moo.cache.enabled = False
+    for count in counts or (100, 300, 3000):
+        for part, expr in parts.items():
+            text = code + expr
+            pure = evaluate(text, count, False) if count <= 1000 else "skipped"
+            native = evaluate(text, count, True)
+            print(f'{count:6d} {part:5s} pure: {pure:40s} native: {native}')
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+'''
+Compare converting every type of a schema with deep shared
+dependencies to JSON Schema one by one with convert() and with one
+Converter, and the former unmemoized dependency closure.
+
+    python bench/bench_jsonschema_convert.py [depth] [width] [old_depth]
+'''
+import sys
+import time
+from moo.util import pathify
+from moo.jsonschema import Converter, convert, get_all_deps
+
+
+def diamonds(depth, width):
+    'Return schema of layers of records each using all of the layer below'
+    schema = [dict(name="Leaf", schema="number", dtype="u4", path=["d"],
+                   deps=[])]
+    below = ["d.Leaf"]
+    for layer in range(depth):
+        here = list()
+        for ind in range(width):
+            name = f"R{layer}x{ind}"
+            fields = [dict(name=f"f{n}", item=item) for n, item in enumerate(below)]
+            schema.append(dict(name=name, schema="record", path=["d"],
+                               fields=fields, deps=list(below)))
+            here.append(f"d.{name}")
+        below = here
+    return schema
+
+
+def former_get_all_deps(flat, deps):
+    'The former, unmemoized moo.jsonschema.get_all_deps()'
+    ret = set(deps)
+    for dep in deps:
+        more = flat[dep].get('deps', [])
+        ret = ret.union(former_get_all_deps(flat, more))
+    return sorted(ret)
+
+
+def main(depth=100, width=4, old_depth=8):
+    schema = diamonds(old_depth, width)
+    flat = pathify(schema)
+    t0 = time.perf_counter()
+    former = former_get_all_deps(flat, schema[-1]["deps"])
+    t1 = time.perf_counter()
+    now = get_all_deps(flat, schema[-1]["deps"])
+    t2 = time.perf_counter()
+    assert former == now
+    print(f'closure of depth {old_depth} width {width}: '
+          f'former {t1-t0:.3f} s, now {t2-t1:.6f} s')
+
+    schema = diamonds(depth, width)
+    t0 = time.perf_counter()
+    one = [convert(target, schema) for target in schema]
+    t1 = time.perf_counter()
+    converter = Converter(schema)
+    many = [converter(target) for target in schema]
+    t2 = time.perf_counter()
+    assert one == many
+    print(f'convert {len(schema)} types of depth {depth} width {width}: '
+          f'one by one {t1-t0:.3f} s, one Converter {t2-t1:.3f} s')
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+'''
+Compare memory held across repeated schema loads with the default
+oschema type registry and with a weak registry.
+
+    python bench/bench_oschema_registry.py [reloads] [types]
+
+Each load uses a new version path, as a long running service might.
+'''
+import sys
+import tracemalloc
+import moo.oschema
+
+
+def make_schema(version, count):
+    path = ["bench", "registry", f"v{version}"]
+    fqn = '.'.join(path)
+    schema = list()
+    for ind in range(count):
+        schema += [
+            dict(name=f"Count{ind}", schema="number", dtype="i4", path=path),
+            dict(name=f"Rec{ind}", schema="record", path=path, fields=[
+                dict(name="count", item=f"{fqn}.Count{ind}")]),
+        ]
+    return schema
+
+
+def main(reloads=200, count=100):
+    for weak in (False, True):
+        registry = moo.oschema.TypeRegistry(weak) if weak else None
+        tracemalloc.start()
+        for version in range(reloads):
+            types = moo.oschema.typify(make_schema(version, count), registry)
+        held = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        size = len(registry or moo.oschema.default_registry)
+        print(f'{"weak" if weak else "default":7s} registry: {size:6d} types, '
+              f'{held/1e6:6.1f} MB held after {reloads} loads')
+        del types
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
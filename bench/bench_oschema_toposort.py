@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+'''
+Compare the recursive topological sort which moo.oschema.toposort()
+once was with the current one on a synthetic graph of types.
+
+    python bench/bench_oschema_toposort.py [count]
+'''
+import sys
+import time
+import random
+import moo.oschema
+
+
+class Node:
+    def __init__(self, deps):
+        self.deps = deps
+
+
+def make_graph(count, ndeps=3, seed=42):
+    'Return a random DAG in shuffled order'
+    rng = random.Random(seed)
+    names = [f"t{ind}" for ind in range(count)]
+    graph = {name: Node([names[rng.randrange(ind)]
+                         for _ in range(min(ind, ndeps))])
+             for ind, name in enumerate(names)}
+    keys = list(graph)
+    rng.shuffle(keys)
+    return {key: graph[key] for key in keys}
+
+
+def recursive_toposort(graph):
+    'The former moo.oschema.toposort()'
+    ret = list()
+    marks = dict()
+    nodes = list(graph.keys())
+
+    def visit(node):
+        if node not in graph:
+            return
+        mark = marks.get(node, None)
+        if mark == "perm":
+            return
+        if mark == "temp":
+            raise ValueError("type dependency graph is not a DAG")
+        marks[node] = "temp"
+        for dep in graph[node].deps:
+            visit(dep)
+        marks[node] = "perm"
+        ret.append(node)
+
+    while nodes:
+        visit(nodes.pop(0))
+        nodes = [n for n in nodes if n not in marks]
+    return ret
+
+
+def main(count=50000):
+    graph = make_graph(count)
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 4*count))
+
+    t0 = time.perf_counter()
+    new = moo.oschema.toposort(graph)
+    t1 = time.perf_counter()
+    levels = moo.oschema.toposort_levels(graph)
+    t2 = time.perf_counter()
+    print(f'toposort          {count} types: {t1-t0:.3f} s')
+    print(f'toposort_levels   {count} types: {t2-t1:.3f} s, {len(levels)} levels')
+
+    t0 = time.perf_counter()
+    old = recursive_toposort(graph)
+    t1 = time.perf_counter()
+    assert old == new
+    print(f'former toposort   {count} types: {t1-t0:.3f} s')
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+'''
+Time making Python types for a large schema with and without the
+on-disk module cache.
+
+    python bench/bench_otypes_cache.py [ntypes]
+
+Each measurement runs in a fresh process, as a service start would.
+'''
+import os
+import sys
+import json
+import tempfile
+import subprocess
+
+run = '''
+import sys, json, time
+import moo.otypes
+schema = json.load(open(sys.argv[1]))
+t0 = time.perf_counter()
+moo.otypes.make_types(schema, cache=sys.argv[2] == "cache")
+print(time.perf_counter() - t0)
+'''
+
+
+def make_schema(ntypes):
+    'Return a schema with about ntypes types'
+    path = ["bench", "otypes"]
+    schema = list()
+    for ind in range(ntypes // 4):
+        num = dict(name=f"Num{ind}", schema="number", dtype="i4", path=path,
+                   constraints=dict(minimum=0))
+        txt = dict(name=f"Txt{ind}", schema="string", pattern="^[a-z]+$",
+                   path=path)
+        fqn = '.'.join(path)
+        rec = dict(name=f"Rec{ind}", schema="record", path=path, fields=[
+            dict(name="num", item=f"{fqn}.Num{ind}", default=0),
+            dict(name="txt", item=f"{fqn}.Txt{ind}", default="a"),
+        ])
+        seq = dict(name=f"Seq{ind}", schema="sequence", path=path,
+                   items=f"{fqn}.Rec{ind}")
+        schema += [num, txt, rec, seq]
+    return schema
+
+
+def timeit(sfile, mode, env):
+    out = subprocess.check_output([sys.executable, "-c", run, sfile, mode],
+                                  env=env)
+    return float(out)
+
+
+def main(ntypes=1500):
+    with tempfile.TemporaryDirectory() as tmp:
+        sfile = os.path.join(tmp, "schema.json")
+        json.dump(make_schema(ntypes), open(sfile, "w"))
+        env = dict(os.environ, MOO_CACHE_DIR=tmp)
+        env.pop("PYTHONDONTWRITEBYTECODE", None)
+        print(f'{ntypes} types')
+        print(f'no cache   {timeit(sfile, "none", env):.3f} s')
+        print(f'cold cache {timeit(sfile, "cache", env):.3f} s')
+        print(f'warm cache {timeit(sfile, "cache", env):.3f} s')
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+'''
+Compare assembling records field by field, with overwrites, with and
+without deferred validation.
+
+    python bench/bench_otypes_deferred.py [count]
+'''
+import sys
+import time
+import moo.otypes
+
+
+def main(count=20000):
+    path = ["bench", "deferred"]
+    fqn = '.'.join(path)
+    types = moo.otypes.make_types([
+        dict(name="Name", schema="string", pattern="^[a-z]+[0-9]*$",
+             path=path),
+        dict(name="Host", schema="string", format="hostname", path=path),
+        dict(name="Port", schema="number", dtype="u2", path=path,
+             constraints=dict(minimum=1024)),
+        dict(name="Conf", schema="record", path=path, fields=[
+            dict(name="name", item=f"{fqn}.Name"),
+            dict(name="host", item=f"{fqn}.Host"),
+            dict(name="port", item=f"{fqn}.Port"),
+        ]),
+    ], cache=False)
+    Conf = types[f"{fqn}.Conf"]
+
+    def assemble():
+        ret = list()
+        for n in range(count):
+            conf = Conf(name="default", host="localhost", port=5000)
+            conf.name = f"conf{n}"
+            conf.host = f"host{n % 10}.example.com"
+            conf.port = 5000 + n % 1000
+            ret.append(conf)
+        return [one.pod() for one in ret]
+
+    t0 = time.perf_counter()
+    want = assemble()
+    t1 = time.perf_counter()
+    with moo.otypes.deferred():
+        got = assemble()
+    t2 = time.perf_counter()
+    assert got == want
+    print(f'immediate {count/(t1-t0):9.0f}/s  deferred {count/(t2-t1):9.0f}/s')
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
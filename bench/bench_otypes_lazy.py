@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+'''
+Compare making all types of a large schema with making them lazily
+when only a few are used.
+
+    python bench/bench_otypes_lazy.py [count] [used]
+'''
+import sys
+import time
+import moo.otypes
+
+
+def make_schema(path, count):
+    fqn = '.'.join(path)
+    schema = list()
+    for ind in range(count):
+        schema += [
+            dict(name=f"Count{ind}", schema="number", dtype="i4", path=path),
+            dict(name=f"Name{ind}", schema="string", path=path),
+            dict(name=f"Rec{ind}", schema="record", path=path, fields=[
+                dict(name="count", item=f"{fqn}.Count{ind}"),
+                dict(name="name", item=f"{fqn}.Name{ind}", default="")]),
+        ]
+    return schema
+
+
+def main(count=1000, used=10):
+    for lazy in (False, True):
+        path = ["bench", "lazy", "lazy" if lazy else "eager"]
+        schema = make_schema(path, count)
+        t0 = time.perf_counter()
+        types = moo.otypes.make_types(schema, cache=False, lazy=lazy)
+        t1 = time.perf_counter()
+        for ind in range(used):
+            types['.'.join(path + [f"Rec{ind}"])](count=ind)
+        t2 = time.perf_counter()
+        print(f'{"lazy" if lazy else "eager":5s} {len(schema)} types: '
+              f'make {t1-t0:.3f} s, use {used} records {t2-t1:.3f} s')
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+'''
+Compare making many records one by one and with make_many().
+
+    python bench/bench_otypes_many.py [count]
+'''
+import sys
+import time
+import moo.otypes
+
+
+def make_schema(path):
+    fqn = '.'.join(path)
+    return [
+        dict(name="Count", schema="number", dtype="i4", path=path,
+             constraints=dict(minimum=0)),
+        dict(name="Real", schema="number", dtype="f8", path=path),
+        dict(name="Name", schema="string", pattern="^[a-z]+[0-9]*$", path=path),
+        dict(name="Kind", schema="enum", symbols=["a", "b", "c"], path=path,
+             default="a"),
+        dict(name="Item", schema="record", path=path, fields=[
+            dict(name="count", item=f"{fqn}.Count"),
+            dict(name="real", item=f"{fqn}.Real"),
+            dict(name="name", item=f"{fqn}.Name"),
+            dict(name="kind", item=f"{fqn}.Kind"),
+        ]),
+    ]
+
+
+def main(count=100000):
+    data = [dict(count=n, real=n/7, name=f'name{n % 100}', kind="abc"[n % 3])
+            for n in range(count)]
+    for compact in (False, True):
+        path = ["bench", "many", "compact" if compact else "usual"]
+        types = moo.otypes.make_types(make_schema(path), cache=False,
+                                      compact=compact)
+        Item = types['.'.join(path + ["Item"])]
+        t0 = time.perf_counter()
+        one = [Item(row) for row in data]
+        t1 = time.perf_counter()
+        many = moo.otypes.make_many(Item, data)
+        t2 = time.perf_counter()
+        assert many[-1].pod() == one[-1].pod()
+        mode = "compact" if compact else "usual"
+        print(f'{mode:8s} one by one {count/(t1-t0):9.0f}/s  '
+              f'make_many {count/(t2-t1):9.0f}/s')
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+'''
+Measure memory held by a sequence of records made in the usual and in
+compact mode.
+
+    python bench/bench_otypes_memory.py [count]
+'''
+import sys
+import time
+import tracemalloc
+import moo.otypes
+
+
+def make_schema(path):
+    fqn = '.'.join(path)
+    return [
+        dict(name="Count", schema="number", dtype="i4", path=path),
+        dict(name="Real", schema="number", dtype="f8", path=path),
+        dict(name="Name", schema="string", path=path),
+        dict(name="Flag", schema="boolean", path=path),
+        dict(name="Item", schema="record", path=path, fields=[
+            dict(name="count", item=f"{fqn}.Count"),
+            dict(name="real", item=f"{fqn}.Real"),
+            dict(name="name", item=f"{fqn}.Name"),
+            dict(name="flag", item=f"{fqn}.Flag"),
+        ]),
+        dict(name="Items", schema="sequence", path=path, items=f"{fqn}.Item"),
+    ]
+
+
+def measure(count, compact):
+    path = ["bench", "compact" if compact else "usual"]
+    types = moo.otypes.make_types(make_schema(path), cache=False,
+                                  compact=compact)
+    Items = types['.'.join(path + ["Items"])]
+    data = [dict(count=n, real=n/3, name=f'item{n}', flag=n % 2 == 0)
+            for n in range(count)]
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    items = Items(data)
+    dt = time.perf_counter() - t0
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert items.pod() == data
+    return size, dt
+
+
+def main(count=100000):
+    for compact in (False, True):
+        size, dt = measure(count, compact)
+        mode = "compact" if compact else "usual"
+        print(f'{mode:8s} {count} records: {size/2**20:8.1f} MiB '
+              f'{size/count:6.0f} B/record, made in {dt:.2f} s')
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+'''
+Measure time and memory to make a sequence of numbers from a list and
+from a numpy array.
+
+    python bench/bench_otypes_numseq.py [count]
+'''
+import sys
+import time
+import tracemalloc
+import numpy
+import moo.otypes
+
+
+def main(count=1000000):
+    path = ["bench", "numseq"]
+    types = moo.otypes.make_types([
+        dict(name="Chan", schema="number", dtype="u4", path=path,
+             constraints=dict(maximum=2**31)),
+        dict(name="Chans", schema="sequence", items="bench.numseq.Chan",
+             path=path),
+    ], cache=False)
+    Chans = types["bench.numseq.Chans"]
+    lst = list(range(count))
+    for what, data in (("list", lst), ("array", numpy.array(lst, 'u4'))):
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        try:
+            chans = Chans(data)
+        except ValueError as err:
+            print(f'{what:6s} not accepted: {err}')
+            tracemalloc.stop()
+            continue
+        dt = time.perf_counter() - t0
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        t0 = time.perf_counter()
+        chans.pod()
+        pt = time.perf_counter() - t0
+        print(f'{what:6s} {count} numbers: made in {dt:.3f} s, '
+              f'{size/2**20:.1f} MiB, pod in {pt:.3f} s')
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
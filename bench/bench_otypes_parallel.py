@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+'''
+Compare making many records in this process and in a pool of worker
+processes which receive the types by pickling.
+
+    python bench/bench_otypes_parallel.py [count] [jobs]
+
+The workers are spawned and so know nothing of the types but what
+comes with the pickled records.
+'''
+import sys
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import moo.otypes
+
+path = ["bench", "parallel"]
+
+
+def make_schema():
+    fqn = '.'.join(path)
+    return [
+        dict(name="Count", schema="number", dtype="i4", path=path,
+             constraints=dict(minimum=0)),
+        dict(name="Real", schema="number", dtype="f8", path=path),
+        dict(name="Name", schema="string", pattern="^[a-z]+[0-9]*$", path=path),
+        dict(name="Kind", schema="enum", symbols=["a", "b", "c"], path=path,
+             default="a"),
+        dict(name="Item", schema="record", path=path, fields=[
+            dict(name="count", item=f"{fqn}.Count"),
+            dict(name="real", item=f"{fqn}.Real"),
+            dict(name="name", item=f"{fqn}.Name"),
+            dict(name="kind", item=f"{fqn}.Kind"),
+        ]),
+    ]
+
+
+def build(Item, rows):
+    'Make records of type Item from rows'
+    return [Item(row) for row in rows]
+
+
+def main(count=100000, jobs=4):
+    types = moo.otypes.make_types(make_schema(), cache=False)
+    Item = types['.'.join(path + ["Item"])]
+    data = [dict(count=n, real=n/7, name=f'name{n % 100}', kind="abc"[n % 3])
+            for n in range(count)]
+
+    t0 = time.perf_counter()
+    serial = build(Item, data)
+    t1 = time.perf_counter()
+
+    size = (count + jobs - 1) // jobs
+    chunks = [data[ind:ind+size] for ind in range(0, count, size)]
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(jobs, mp_context=ctx) as pool:
+        list(pool.map(build, [Item]*jobs, [[] for _ in range(jobs)])) # warm
+        t2 = time.perf_counter()
+        parallel = list()
+        for one in pool.map(build, [Item]*len(chunks), chunks):
+            parallel += one
+        t3 = time.perf_counter()
+
+    assert [one.pod() for one in parallel] == [one.pod() for one in serial]
+    print(f'serial      {count/(t1-t0):9.0f}/s')
+    print(f'{jobs} workers   {count/(t3-t2):9.0f}/s')
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+'''
+Measure throughput of constructing and pod()-ing otypes records.
+
+    python bench/bench_otypes_records.py [count]
+'''
+import sys
+import time
+import moo.otypes
+
+
+def make_schema(path):
+    fqn = '.'.join(path)
+    return [
+        dict(name="Count", schema="number", dtype="i4", path=path),
+        dict(name="Real", schema="number", dtype="f8", path=path),
+        dict(name="Name", schema="string", path=path),
+        dict(name="Flag", schema="boolean", path=path),
+        dict(name="Item", schema="record", path=path, fields=[
+            dict(name="count", item=f"{fqn}.Count"),
+            dict(name="real", item=f"{fqn}.Real", default=1.5),
+            dict(name="name", item=f"{fqn}.Name", default="none"),
+            dict(name="flag", item=f"{fqn}.Flag", default=False),
+        ]),
+    ]
+
+
+def rate(func, count):
+    t0 = time.perf_counter()
+    func()
+    return count / (time.perf_counter() - t0)
+
+
+def main(count=20000):
+    for compact in (False, True):
+        path = ["bench", "records", "compact" if compact else "usual"]
+        types = moo.otypes.make_types(make_schema(path), cache=False,
+                                      compact=compact)
+        Item = types['.'.join(path + ["Item"])]
+        data = [dict(count=n) if n % 2 else
+                dict(count=n, real=n/3, name=f'item{n}', flag=True)
+                for n in range(count)]
+        items = list()
+        made = rate(lambda: items.extend([Item(one) for one in data]), count)
+        podded = rate(lambda: [one.pod() for one in items], count)
+        item = items[0]
+        def setit():
+            for n in range(count):
+                item.count = n
+        assigned = rate(setit, count)
+        mode = "compact" if compact else "usual"
+        print(f'{mode:8s} construct {made:9.0f}/s  pod {podded:9.0f}/s  '
+              f'assign {assigned:9.0f}/s')
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+'''
+Microbenchmark of checking strings with a pattern and a format as a
+generic JSON Schema validation and as an otypes string type.
+
+    python bench/bench_otypes_string.py [count]
+'''
+import sys
+import time
+import moo.otypes
+import moo.jsonschema
+
+
+def rate(func, values):
+    t0 = time.perf_counter()
+    for val in values:
+        func(val)
+    return len(values) / (time.perf_counter() - t0)
+
+
+def main(count=100000):
+    values = [f'host{n}.example.com' for n in range(count)]
+    for kwds in (dict(pattern="^[a-z0-9.]+$"), dict(format="hostname")):
+        Str = moo.otypes.make_type(name="Str", schema="string",
+                                   path="bench.string", **kwds)
+        schema = dict(type="string", **kwds)
+        generic = rate(lambda v: moo.jsonschema.validate(v, schema), values)
+        typed = rate(Str, values)
+        print(f'{list(kwds)[0]:8s} jsonschema {generic:9.0f}/s  '
+              f'otypes {typed:9.0f}/s')
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+'''
+Time CLI startup for commands which should not load heavy modules.
+
+    python bench/bench_startup.py [runs] [max-seconds]
+
+If max-seconds is given, exit with failure if the median time of any
+command exceeds it.
+'''
+import sys
+import time
+import statistics
+import subprocess
+
+commands = (["version"], ["resolve", "moo.jsonnet"], ["path", "j2"])
+
+
+def timeit(args, runs):
+    'Return median seconds to run moo with args'
+    times = list()
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, "-m", "moo"] + args, check=True,
+                       stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times)
+
+
+def main(runs=10, limit=None):
+    t0 = time.perf_counter()
+    for _ in range(runs):
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+    base = (time.perf_counter() - t0) / runs
+    print(f'{"python":24s} {base*1000:7.1f} ms')
+    slow = False
+    for args in commands:
+        dt = timeit(args, runs)
+        print(f'{"moo " + " ".join(args):24s} {dt*1000:7.1f} ms')
+        if limit is not None and dt > limit:
+            slow = True
+    if slow:
+        sys.exit(f'startup exceeds {limit} s')
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 10,
+         float(args[1]) if len(args) > 1 else None)
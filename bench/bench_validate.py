@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+'''
+Time validating many models against one JSON Schema.
+
+    python bench/bench_validate.py [count]
+'''
+import sys
+import time
+import moo.jsonschema
+
+schema = {
+    "$schema": "http://json-schema.org/draft-07/schema#",
+    "type": "object",
+    "properties": {
+        "name": {"type": "string", "pattern": "^[a-z]+[0-9]*$"},
+        "count": {"type": "integer", "minimum": 0},
+        "host": {"type": "string", "format": "ipv4"},
+    },
+}
+
+
+def main(count=10000):
+    models = [dict(name=f'name{n}', count=n, host="127.0.0.1")
+              for n in range(count)]
+    for validator in ("jsonschema", "fastjsonschema"):
+        moo.jsonschema.compiled_validators.clear()
+        t0 = time.perf_counter()
+        for model in models:
+            moo.jsonschema.validate(model, schema, validator)
+        dt = time.perf_counter() - t0
+        print(f'{validator:16s} {count} models in {dt:.3f} s '
+              f'({len(moo.jsonschema.compiled_validators)} compiled)')
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+'''
+Compare validating many models against an oschema record with the
+jsonschema, fastjsonschema and native validators.
+
+    python bench/bench_validate_native.py [count]
+'''
+import sys
+import time
+from moo.ovalid import validate_many
+
+path = ["bench", "native"]
+
+
+def make_context():
+    fqn = '.'.join(path)
+    return [
+        dict(name="Count", schema="number", dtype="u4", path=path, deps=[],
+             constraints=dict(maximum=1000)),
+        dict(name="Real", schema="number", dtype="f8", path=path, deps=[]),
+        dict(name="Name", schema="string", pattern="^[a-z]+[0-9]*$",
+             path=path, deps=[]),
+        dict(name="Kind", schema="enum", symbols=["a", "b", "c"], path=path,
+             deps=[]),
+        dict(name="Reals", schema="sequence", items=f"{fqn}.Real", path=path,
+             deps=[f"{fqn}.Real"]),
+        dict(name="Item", schema="record", path=path, fields=[
+            dict(name="count", item=f"{fqn}.Count"),
+            dict(name="name", item=f"{fqn}.Name"),
+            dict(name="reals", item=f"{fqn}.Reals"),
+        ], deps=[f"{fqn}.Count", f"{fqn}.Name", f"{fqn}.Reals"]),
+    ]
+
+
+def main(count=20000):
+    context = make_context()
+    target = context[-1]
+    models = [dict(count=n % 1000, name=f'name{n % 100}',
+                   reals=[n/7, n/3, 1.0])
+              for n in range(count)]
+    targets = [target] * count
+    want = None
+    for validator in ("jsonschema", "fastjsonschema", "native"):
+        t0 = time.perf_counter()
+        res = validate_many(models, targets, context, False, validator)
+        dt = time.perf_counter() - t0
+        assert all(res) and (want is None or res == want)
+        want = res
+        print(f'{validator:15s} {count/dt:9.0f} models/s')
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
@@ -1,27 +1,33 @@
-import moo.jsonnet
-import moo.templates
-import moo.util
-import moo.io
-import moo.csvio
-import moo.oschema
-import moo.otypes
-import moo.ovalid
-import moo.jsonschema
+'''
+moo 無 Model Oriented Objects
+
+Submodules are imported on first use so that eg "moo version" does not
+pay for loading Jsonnet, Jinja, JSON Schema, numpy or openpyxl.
+'''
+import importlib
+from importlib.util import find_spec
 from moo.version import version
 
 __version__ = version
 
+# Submodules that are imported on first attribute access.
+submodules = ("cache", "jsonnet", "templates", "util", "io", "jsonio",
+              "csvio", "oschema", "otypes", "ovalid", "jsonschema", "xls")
+
+
+def __getattr__(name):
+    if name in submodules:
+        return importlib.import_module(f'moo.{name}')
+    raise AttributeError(f"module 'moo' has no attribute '{name}'")
+
+
 # note: schema is an alias for jsonnet
-known_extensions = ["jsonnet", "json", "csv", "xml", "yaml", "ini",
+known_extensions = ["jsonnet", "json", "jsonl", "csv", "xml", "yaml", "ini",
                     "schema"]
-try:
-    import moo.xls
-except ImportError:
-    print("moo: no support for loading spreadsheets")
-else:
+# spreadsheet support depends on openpyxl which is not imported here
+if find_spec("openpyxl") is not None:
     known_extensions += ["xls", "xlsx"]
 
-
 def imports(filename, path, **kwds):
     '''Return list of files imported by a file
     
@@ -30,7 +36,9 @@ def imports(filename, path, **kwds):
     For Jsonnet files, kwds may provide TLAs.
     '''
     if filename.endswith('.jsonnet'):
+        import moo.jsonnet
         return moo.jsonnet.imports(filename, path, **kwds)
     if filename.endswith('.j2'):
+        import moo.templates
         return moo.templates.imports(filename, path)
     raise ValueError(f'unknown file type: {filename}')
@@ -4,6 +4,7 @@ Main CLI to moo
 '''
 import os
 import re
+import sys
 import json
 import click
 import moo
@@ -112,6 +113,52 @@ class Context:
         tpath = self.search_path(templ_file)
         return moo.templates.render(templ, params, tpath)
 
+    def render_digest(self, templ_file, model=None):
+        '''
+        Return a digest over all that a render of templ_file depends on.
+
+        This covers the model, the template and its transitive imports.
+        Every candidate file for these along the template search path
+        is included, so a new file shadowing one that is used also
+        changes the digest.  None is returned if the model can not be
+        digested.
+        '''
+        templ = self.resolve(templ_file)
+        helper = self.just_load("moo.jsonnet", dpath="templ")
+        tpath = self.search_path(templ_file)
+        deps = moo.templates.candidates(templ, tpath)
+        deps = [(one, moo.cache.file_digest(one)) for one in deps]
+        try:
+            return moo.cache.digest(moo.__version__, deps, helper, model)
+        except TypeError:       # eg, a transform made non-JSON data
+            return None
+
+    def render_one(self, one, outdir, known=None):
+        '''
+        Render one moo.render() object to its file under outdir.
+
+        If known is given, it is the manifest record from a prior
+        render of the file and rendering is skipped when neither the
+        file nor anything the render depends on has changed.  A file
+        is not rewritten if its content is unchanged.
+
+        Return the manifest record for the file.
+        '''
+        data = self.transform(one["model"], one.get("transform", ()))
+        output = os.path.join(outdir, one["filename"])
+        digest = self.render_digest(one["template"], data)
+        if digest and known and known.get("digest") == digest:
+            if moo.cache.file_digest(output) == known.get("output"):
+                return known
+        text = self.render(one["template"], data)
+        record = dict(digest=digest, output=moo.cache.content_digest(text))
+        if moo.cache.file_digest(output) == record["output"]:
+            return record
+        odir = os.path.dirname(output)
+        os.makedirs(odir, exist_ok=True)
+        self.save(output, text)
+        return record
+
     def imports(self, filename):
         '''
         Return list of files the given file imports.
@@ -127,6 +174,14 @@ class Context:
         '''Save data to named file.  If intermediate path is missing, it will
         be created.
         '''
+        if filename == "/dev/stdout":
+            # write via sys.stdout which may be captured, eg by moo serve
+            if isinstance(data, str):
+                data = data.encode()
+            sys.stdout.flush()
+            sys.stdout.buffer.write(data)
+            sys.stdout.buffer.flush()
+            return
         absdir = os.path.dirname(os.path.realpath(filename))
         if not os.path.exists(absdir):
             os.makedirs(absdir)
@@ -154,11 +209,15 @@ cmddef = dict(context_settings = dict(help_option_names=['-h', '--help']))
               help="Graft a data structure given in a model file into the model in the form: /json/ptr:file.jsonnet")
 @click.option('-t', '--transform', multiple=True, type=str,
               help="Specify a model transform")
+@click.option('--cache/--no-cache', default=True,
+              help="Use on-disk cache of evaluated Jsonnet files (location set by MOO_CACHE_DIR env var)")
 @click.pass_context
-def cli(ctx, dpath, mpath, tpath, tla, graft, transform):
+def cli(ctx, dpath, mpath, tpath, tla, graft, transform, cache):
     '''
     moo command line interface
     '''
+    moo.cache.enabled = cache
+    moo.cache.modules = cache
     ctx.obj = Context(dpath, mpath, tpath, tla, transform, graft)
 
 
@@ -203,11 +262,13 @@ def path(ctx, filename):
 @click.option("--passfail", default=False, is_flag=True,
               help="Print PASS or FAIL instead of null/throw")
 @click.option('-V', '--validator', default="jsonschema",
-              type=click.Choice(["jsonschema", "fastjsonschema"]),
-              help="Specify which validator")
+              type=click.Choice(["jsonschema", "fastjsonschema", "native"]),
+              help="Specify which validator, native checks directly against oschema")
+@click.option('-j', '--jobs', default=1, type=click.IntRange(min=0),
+              help="Number of parallel validation processes in sequence mode, 0 for one per CPU, default is 1")
 @click.argument('model')
 @click.pass_context
-def cmd_validate(ctx, output, schema, target, sequence, passfail, validator, model):
+def cmd_validate(ctx, output, schema, target, sequence, passfail, validator, jobs, model):
     '''
     Validate models against target schema.
 
@@ -243,6 +304,7 @@ def cmd_validate(ctx, output, schema, target, sequence, passfail, validator, mod
 
     In the special cases that all target schema are either in JSON Schema form or are in moo oschema form but lack any type dependency, a context schema is not required.
 
+    In sequence mode, a single target applies to all models.  Models sharing a target schema are validated together so that each distinct target is compiled once.  With -j/--jobs other than 1 they are validated in a pool of that many processes.
 
     '''
 
@@ -255,11 +317,15 @@ def cmd_validate(ctx, output, schema, target, sequence, passfail, validator, mod
     models = ctx.obj.load(model)
     if not sequence:
         models = [models]
+    elif len(targets) == 1:
+        # one target for all models
+        targets = targets * len(models)
 
     if len(targets) != len(models):
         raise ValueError(f'sequence size mismatch: #models:{len(models)}, #targets:{len(targets)}\nDid you forget --sequence?')
 
-    res = moo.ovalid.validate(models, targets, context, not passfail, validator)
+    res = moo.ovalid.validate_many(models, targets, context, not passfail,
+                                   validator, None if jobs == 1 else jobs)
     text = json.dumps(res, indent=4)
     ctx.obj.save(output, text)
 
@@ -381,15 +447,16 @@ def jsonschema(ctx, output, target, oschema):
     '''
     Convert from moo oschema to JSON Schema
     '''
-    from moo.jsonschema import convert
+    from moo.jsonschema import Converter
 
     context = ctx.obj.just_load(oschema)
+    convert = Converter(context)
     if target is None:
         targets = [context]
     else:
         targets = moo.util.resolve_schema(target, context, ctx.obj.just_load)
 
-    jtext = [json.dumps( convert(target, context), indent=4 ) for target in targets]
+    jtext = [json.dumps( convert(target), indent=4 ) for target in targets]
     ctx.obj.save(output, '\n'.join(jtext))
     
 
@@ -448,29 +515,103 @@ def render_deps(ctx, target, output, model, templ):
     ctx.obj.save(output, result)
 
 
+def render_worker_init(cache):
+    '''
+    Initialize a render-many worker process with parent settings.
+    '''
+    moo.cache.enabled = cache
+    moo.cache.modules = cache
+
+
+# Name of file in the render-many output directory recording what
+# each output was rendered from.
+render_manifest = ".moo-render-manifest.json"
+
+
+def load_manifest(outdir):
+    '''
+    Return the render manifest in outdir or empty dict.
+    '''
+    try:
+        with open(os.path.join(outdir, render_manifest)) as fp:
+            manifest = json.load(fp)
+    except (OSError, ValueError):
+        return dict()
+    if not isinstance(manifest, dict):
+        return dict()
+    return manifest
+
+
+def save_manifest(outdir, manifest):
+    '''
+    Save the render manifest to outdir.
+    '''
+    os.makedirs(outdir, exist_ok=True)
+    fname = os.path.join(outdir, render_manifest)
+    with open(fname + ".tmp", "w") as fp:
+        json.dump(manifest, fp, indent=4, sort_keys=True)
+    os.replace(fname + ".tmp", fname)
+
+
 @cli.command('render-many')
 @click.option('-o', '--outdir', default=".",
               type=click.Path(dir_okay=True, file_okay=False),
               help="Output directory, default is '.'")
+@click.option('-j', '--jobs', default=1, type=click.IntRange(min=0),
+              help="Number of parallel render processes, 0 for one per CPU, default is 1")
+@click.option('--force', default=False, is_flag=True,
+              help="Render all files even if they appear up to date")
 @click.argument('model')
 @click.pass_context
-def render_many(ctx, outdir, model):
+def render_many(ctx, outdir, jobs, force, model):
     '''Render many files for a project.
 
     The model found at the data path dpath should be a Jsonnet array
     of moo.render() objects.
 
+    A manifest file in the output directory records a digest of the
+    transformed model, the template and its imports for each output.
+    An output is only rendered again when its digest changes, unless
+    --force is given.
+
+    With -j/--jobs other than 1 the objects are rendered in a pool of
+    processes.  Each output is written as soon as it is rendered and
+    any failures are reported per object after all are attempted.
+
     '''
     data = ctx.obj.load(model)
-    for one in data:
-        data = ctx.obj.transform(one["model"], one.get("transform", ()))
-        text = ctx.obj.render(one["template"], data)
-        output = os.path.join(outdir, one["filename"])
-        # print(f"generating {output}:")
-        odir = os.path.dirname(output)
-        if not os.path.exists(odir):
-            os.makedirs(odir)
-        ctx.obj.save(output, text)
+    manifest = load_manifest(outdir)
+
+    def known(one):
+        if force:
+            return None
+        return manifest.get(one["filename"])
+
+    if jobs == 1:
+        try:
+            for one in data:
+                manifest[one["filename"]] = ctx.obj.render_one(
+                    one, outdir, known(one))
+        finally:
+            save_manifest(outdir, manifest)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    failed = 0
+    with ProcessPoolExecutor(jobs or None, initializer=render_worker_init,
+                             initargs=(moo.cache.enabled,)) as pool:
+        futures = {pool.submit(ctx.obj.render_one, one, outdir, known(one)): (ind, one)
+                   for ind, one in enumerate(data)}
+        for fut in as_completed(futures):
+            ind, one = futures[fut]
+            try:
+                manifest[one["filename"]] = fut.result()
+            except Exception as err:
+                failed += 1
+                click.echo(f'render-many: entry {ind} ({one["filename"]}) failed: {type(err).__name__}: {err}', err=True)
+    save_manifest(outdir, manifest)
+    if failed:
+        raise click.ClickException(f'{failed} of {len(data)} renders failed')
 
 
 @cli.command()
@@ -502,7 +643,52 @@ def version():
     click.echo(moo.__version__)
 
 
+@cli.command()
+@click.option('-s', '--socket', 'sockpath', envvar='MOO_SERVE_SOCKET',
+              type=click.Path(dir_okay=False, file_okay=True),
+              help="Unix socket to listen on (can use MOO_SERVE_SOCKET env var)")
+@click.option('--stop', default=False, is_flag=True,
+              help="Stop a running server")
+def serve(sockpath, stop):
+    '''Serve moo commands from a long-lived process.
+
+    The server listens on a Unix socket for moo commands.  When the
+    MOO_SERVE_SOCKET environment variable names the socket of a
+    running server, the moo command line forwards all commands other
+    than "serve" to the server which runs them with warm caches.  If
+    no server accepts a command, it runs locally.  A command the
+    server accepted fails if no response comes within MOO_SERVE_TIMEOUT
+    seconds, if set.
+    '''
+    import moo.serve
+    sockpath = sockpath or moo.serve.default_socket()
+    if stop:
+        try:
+            moo.serve.request(sockpath, dict(stop=True))
+        except (OSError, RuntimeError) as err:
+            raise click.ClickException(f'no server at {sockpath}: {err}')
+        return
+    try:
+        moo.serve.serve(sockpath)
+    except RuntimeError as err:
+        raise click.ClickException(str(err))
+
+
 def main():
+    sockpath = os.environ.get("MOO_SERVE_SOCKET")
+    if sockpath:
+        from moo.serve import forward, command_name
+        if command_name(cli, sys.argv[1:]) != "serve":
+            try:
+                status = forward(sockpath, sys.argv[1:])
+            except OSError:
+                pass            # no server took the command, run locally
+            except RuntimeError as err:
+                # the server may yet run it, so do not run it again
+                sys.stderr.write(f'moo: {err}\n')
+                sys.exit(1)
+            else:
+                sys.exit(status)
     cli(obj=None)
 
 
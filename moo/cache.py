@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+'''
+Persistent, content-addressed caching of derived data.
+
+Cached entries are files, JSON by default, held in a cache directory.  The
+directory is found from, in order: the "directory" attribute of this
+module, the MOO_CACHE_DIR environment variable or a "moo" directory
+under the XDG cache location.
+
+The total size of each named cache is bounded.  When a store exceeds
+the bound, the least recently used entries, by access time, are removed.
+'''
+import os
+import json
+import hashlib
+import tempfile
+import time
+
+# Application may set these.  When "enabled" is False no cache is
+# consulted nor written.  The CLI exposes this as --no-cache.
+enabled = True
+# When also "modules" is True, Python modules generated by moo, eg by
+# moo.otypes.make_types(), are cached.  This is off for library use
+# and the CLI turns it on unless --no-cache.
+modules = False
+directory = None
+# Maximum total bytes per named cache, MOO_CACHE_SIZE may override.
+max_size = 256 * 2**20
+
+
+def cache_dir():
+    '''
+    Return the top cache directory.
+    '''
+    if directory:
+        return directory
+    path = os.environ.get("MOO_CACHE_DIR")
+    if path:
+        return path
+    base = os.environ.get("XDG_CACHE_HOME") or \
+        os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "moo")
+
+
+def digest(*parts):
+    '''
+    Return a hex digest over JSON-serializable parts.
+
+    Object keys are sorted so that equal data gives equal digest.
+    '''
+    text = json.dumps(parts, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def content_digest(content):
+    '''
+    Return a hex digest of bytes or text content.
+    '''
+    if isinstance(content, str):
+        content = content.encode()
+    return hashlib.sha256(content).hexdigest()
+
+
+def file_digest(filename):
+    '''
+    Return hex digest of the contents of a file or None if unreadable.
+    '''
+    try:
+        with open(filename, "rb") as fp:
+            return content_digest(fp.read())
+    except OSError:
+        return None
+
+
+class DiskCache(object):
+    '''
+    A named cache of JSON values held in files under the cache directory.
+    '''
+
+    def __init__(self, name, path=None, size=None, suffix=".json"):
+        '''
+        Create a cache.
+
+        - name :: subdirectory of the cache directory to use
+        - path :: override the top cache directory
+        - size :: override the maximum total bytes
+        - suffix :: file name extension of entries
+        '''
+        self.name = name
+        self.suffix = suffix
+        self.path = os.path.join(path or cache_dir(), name)
+        if size is None:
+            size = int(os.environ.get("MOO_CACHE_SIZE", max_size))
+        self.size = size
+
+    def filename(self, key):
+        'Return the file name holding the entry for key'
+        return os.path.join(self.path, key + self.suffix)
+
+    def read(self, key):
+        '''
+        Return bytes stored at key or None.
+        '''
+        fname = self.filename(key)
+        try:
+            with open(fname, "rb") as fp:
+                data = fp.read()
+        except OSError:
+            return None
+        try:
+            # mark as recently used, keeping mtime which eg Python
+            # checks to validate byte code compiled from the entry
+            os.utime(fname, (time.time(), os.stat(fname).st_mtime))
+        except OSError:
+            pass
+        return data
+
+    def write(self, key, data):
+        '''
+        Store bytes at key, evicting old entries as needed.
+
+        Return True if stored.  Failures to write are quietly ignored.
+        '''
+        if len(data) > self.size:
+            return False
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+            with os.fdopen(fd, "wb") as fp:
+                fp.write(data)
+            os.replace(tmp, self.filename(key))
+        except OSError:
+            return False
+        self.evict()
+        return True
+
+    def get(self, key):
+        '''
+        Return value stored at key or None.
+        '''
+        data = self.read(key)
+        if data is None:
+            return None
+        try:
+            return json.loads(data.decode())
+        except ValueError:
+            return None
+
+    def put(self, key, value):
+        '''
+        Store value at key, evicting old entries as needed.
+
+        Failures to write are quietly ignored.
+        '''
+        self.write(key, json.dumps(value, separators=(',', ':')).encode())
+
+    def entries(self):
+        '''
+        Return list of (atime, size, filename) of entries, least recently
+        used first.
+        '''
+        ret = list()
+        try:
+            names = os.listdir(self.path)
+        except OSError:
+            return ret
+        for one in names:
+            if not one.endswith(self.suffix):
+                continue
+            fname = os.path.join(self.path, one)
+            try:
+                st = os.stat(fname)
+            except OSError:
+                continue
+            ret.append((st.st_atime, st.st_size, fname))
+        ret.sort()
+        return ret
+
+    def evict(self):
+        '''
+        Remove least recently used entries until within size bound.
+        '''
+        entries = self.entries()
+        total = sum([e[1] for e in entries])
+        for _, size, fname in entries:
+            if total <= self.size:
+                break
+            if self.remove(fname):
+                total -= size
+
+    def remove(self, fname):
+        '''
+        Remove the entry file fname, return True if removed.
+        '''
+        try:
+            os.remove(fname)
+        except OSError:
+            return False
+        return True
+
+    def clear(self):
+        '''
+        Remove all entries.
+        '''
+        for _, _, fname in self.entries():
+            self.remove(fname)
@@ -5,7 +5,7 @@ File and other I/O
 import os
 from moo.util import clean_paths, resolve, select_path
 import moo.jsonnet
-import anyconfig
+import moo.jsonio
 
 # Application may set this.  It is a fallback which will be consulted
 # if a file to be loaded is not otherwise located.  See load().
@@ -24,6 +24,12 @@ def load(filename, fpath=(), dpath = None, **kwds):
     provide this fallback.  When moo is used from its CLI the
     MOO_LOAD_PATH environment variable is consulted.
 
+    A JSON file (.json) loaded with a dpath and a JSON Lines file
+    (.jsonl) are scanned so that only the selected data is parsed.
+
+    Raise ValueError if the whole file is null or empty.  Data selected
+    by dpath may be null.
+
     '''
     fmt = os.path.splitext(filename)[-1]
 
@@ -32,11 +38,16 @@ def load(filename, fpath=(), dpath = None, **kwds):
     
     if fmt in (".jsonnet",".schema"):
         data = moo.jsonnet.load(filename, paths, **kwds)
+    elif fmt in (".jsonl",) or (fmt in (".json",) and dpath):
+        data = moo.jsonio.load(filename, paths, dpath)
+        if dpath:               # selected, which may be null
+            return data
     elif fmt in (".csv",):
         data = moo.csvio.load(filename, paths, **kwds)
     elif fmt in (".xls", ".xlsx"):
         data = moo.xls.load(filename, paths, **kwds)
     else:
+        import anyconfig        # slow to import, only load when needed
         data = anyconfig.load(filename)
     if data is None:
         raise ValueError(f'no data from {filename}')
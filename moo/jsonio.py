@@ -0,0 +1,297 @@
+'''
+Load JSON and JSON Lines files with optional data path selection.
+
+When a data path is given, the file is scanned without being parsed
+and only the selected value is parsed.  Memory use is then in
+proportion to the selected value and not to the whole file.
+'''
+import re
+import json
+import mmap
+from moo.util import select_path
+
+_ws = re.compile(rb'[ \t\n\r]*')
+_string = re.compile(rb'"(?:[^"\\]|\\.)*"', re.DOTALL)
+_bracket = re.compile(rb'["\[\]{}]')
+_scalar_end = re.compile(rb'[ \t\n\r,\]}]')
+
+
+def split_path(path, delim='.'):
+    '''
+    Return data path as list, casting integer-like elements to int.
+
+    This follows moo.util.select_path().
+    '''
+    if isinstance(path, str):
+        path = path.split(delim)
+    ret = list()
+    for one in path:
+        if one == '':
+            continue
+        try:
+            one = int(one)
+        except ValueError:
+            pass
+        ret.append(one)
+    return ret
+
+
+class Scanner(object):
+    '''
+    Find values in a buffer holding JSON text without parsing it.
+    '''
+
+    # Number of brackets to step through one by one before skipping
+    # the remainder of a value with a vectorized scan.
+    small = 64
+    # Number of bytes of the first vectorized scan, doubling after
+    # each scan up to the maximum.
+    window = 2**12
+    max_window = 2**22
+
+    def __init__(self, buf):
+        self.buf = buf
+
+    def error(self, msg, pos):
+        return json.JSONDecodeError(msg, "<buffer>", pos)
+
+    def ws(self, pos):
+        'Return position after any whitespace at pos'
+        return _ws.match(self.buf, pos).end()
+
+    def char(self, pos):
+        'Return character at pos as bytes'
+        return self.buf[pos:pos+1]
+
+    def string_end(self, pos):
+        'Return position after the string starting at pos'
+        m = _string.match(self.buf, pos)
+        if m is None:
+            raise self.error("Unterminated string", pos)
+        return m.end()
+
+    def escaped(self, pos):
+        'Return True if character at pos is escaped by a backslash'
+        count = 0
+        while pos > 0 and self.buf[pos-1] == 0x5c:
+            count += 1
+            pos -= 1
+        return count % 2 == 1
+
+    def skip(self, pos):
+        'Return position after the value starting at pos'
+        c = self.char(pos)
+        if c == b'"':
+            return self.string_end(pos)
+        if c in (b'{', b'['):
+            depth = 0
+            for _ in range(self.small):
+                m = _bracket.search(self.buf, pos)
+                if m is None:
+                    raise self.error("Unterminated value", pos)
+                c = m.group()
+                if c == b'"':
+                    pos = self.string_end(m.start())
+                    continue
+                depth += 1 if c in (b'{', b'[') else -1
+                pos = m.end()
+                if depth == 0:
+                    return pos
+            return self.skip_large(pos, depth)
+        m = _scalar_end.search(self.buf, pos)
+        if m is None:
+            return len(self.buf)
+        if m.start() == pos:
+            raise self.error("Expecting value", pos)
+        return m.start()
+
+    def escapes(self, arr, base, index):
+        '''
+        Return mask of which characters at index of arr are escaped.
+
+        The arr holds the buffer starting from base.
+        '''
+        import numpy
+        prev = index - 1
+        count = numpy.zeros(len(index), numpy.int64)
+        live = arr[prev] == 0x5c
+        while live.any():
+            count += live
+            prev -= 1
+            cut = live & (prev < 0)
+            for one in numpy.flatnonzero(cut):
+                count[one] = self.escaped(base + int(index[one]))
+            live &= ~cut
+            live[live] = arr[prev[live]] == 0x5c
+        return count % 2 == 1
+
+    def skip_large(self, pos, depth):
+        '''
+        Return position after the end of a value of which we are at
+        depth at pos and outside of any string.
+        '''
+        import numpy
+        start = pos
+        size = len(self.buf)
+        inside = 0              # 1 if window starts inside a string
+        window = self.window
+        while pos < size:
+            # one byte of look back to find escaped quotes
+            base = pos - 1
+            end = min(size, pos + window)
+            window = min(2*window, self.max_window)
+            arr = numpy.frombuffer(self.buf, numpy.uint8, end - base, base)
+            body = arr[1:]
+
+            quotes = numpy.flatnonzero(body == 0x22) + 1
+            quotes = quotes[~self.escapes(arr, base, quotes)]
+
+            brackets = numpy.flatnonzero((body == 0x5b) | (body == 0x5d) |
+                                         (body == 0x7b) | (body == 0x7d)) + 1
+            nquotes = numpy.searchsorted(quotes, brackets)
+            brackets = brackets[(nquotes + inside) % 2 == 0]
+            kind = arr[brackets]
+            delta = numpy.where((kind == 0x5b) | (kind == 0x7b), 1, -1)
+            level = depth + numpy.cumsum(delta)
+            done = numpy.flatnonzero(level == 0)
+            if len(done):
+                return base + int(brackets[done[0]]) + 1
+            if len(level):
+                depth = int(level[-1])
+            inside = (inside + len(quotes)) % 2
+            pos = end
+        raise self.error("Unterminated value", start)
+
+    def after(self, pos, want):
+        'Return position after expected character at pos'
+        pos = self.ws(pos)
+        if self.char(pos) != want:
+            raise self.error(f"Expecting {want.decode()!r}", pos)
+        return self.ws(pos + 1)
+
+    def members(self, pos):
+        'Iterate over (key, value position) of object at pos'
+        pos = self.ws(pos + 1)
+        if self.char(pos) == b'}':
+            return
+        while True:
+            end = self.string_end(pos)
+            key = json.loads(self.buf[pos:end])
+            pos = self.after(end, b':')
+            yield key, pos
+            pos = self.ws(self.skip(pos))
+            if self.char(pos) == b'}':
+                return
+            pos = self.after(pos, b',')
+
+    def elements(self, pos):
+        'Iterate over value positions of array at pos'
+        pos = self.ws(pos + 1)
+        if self.char(pos) == b']':
+            return
+        while True:
+            yield pos
+            pos = self.ws(self.skip(pos))
+            if self.char(pos) == b']':
+                return
+            pos = self.after(pos, b',')
+
+    def member(self, pos, key):
+        'Return position of value at key of object at pos'
+        if not isinstance(key, str):
+            raise KeyError(key)
+        for one, vpos in self.members(pos):
+            if one == key:
+                return vpos
+        raise KeyError(key)
+
+    def element(self, pos, index):
+        'Return position of value at index of array at pos'
+        if not isinstance(index, int):
+            raise TypeError(f'list indices must be integers, not {type(index).__name__}')
+        if index < 0:
+            found = list(self.elements(pos))
+            return found[index]
+        for count, vpos in enumerate(self.elements(pos)):
+            if count == index:
+                return vpos
+        raise IndexError("list index out of range")
+
+    def select(self, path, pos=0):
+        '''
+        Return the value at data path in value starting at pos.
+        '''
+        pos = self.ws(pos)
+        path = list(path)
+        while path:
+            c = self.char(pos)
+            if c == b'{':
+                pos = self.member(pos, path[0])
+            elif c == b'[':
+                pos = self.element(pos, path[0])
+            else:               # let Python rules apply
+                break
+            path.pop(0)
+        end = self.skip(pos)
+        value = json.loads(self.buf[pos:end])
+        if path:
+            return select_path(value, path)
+        return value
+
+
+def load_json(filename, dpath=None):
+    '''
+    Return the value at dpath in the JSON file.
+    '''
+    path = split_path(dpath or ())
+    with open(filename, "rb") as fp:
+        try:
+            buf = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:      # empty file
+            return None
+        with buf:
+            return Scanner(buf).select(path)
+
+
+def load_lines(filename, dpath=None):
+    '''
+    Return the value at dpath in the JSON Lines file.
+
+    The file is taken to be an array with one element per non-empty
+    line.  A file without such lines gives None, as does an empty JSON
+    file.
+    '''
+    path = split_path(dpath or ())
+    with open(filename, "rb") as fp:
+        lines = (line for line in fp if line.strip())
+        if not path:
+            return [json.loads(line) for line in lines] or None
+        index = path.pop(0)
+        if not isinstance(index, int):
+            raise TypeError(f'list indices must be integers, not {type(index).__name__}')
+        if index < 0:
+            lines = list(lines)
+            try:
+                line = lines[index]
+            except IndexError:
+                raise IndexError("list index out of range") from None
+        else:
+            for count, line in enumerate(lines):
+                if count == index:
+                    break
+            else:
+                raise IndexError("list index out of range")
+    return Scanner(line).select(path)
+
+
+def load(filename, paths=(), dpath=None, **kwds):
+    '''
+    Load a JSON or JSON Lines (.jsonl) file.
+
+    If dpath is given return only the value at that data path.
+
+    Note, follows the same pattern as moo.csvio.load().
+    '''
+    if filename.endswith(".jsonl"):
+        return load_lines(filename, dpath)
+    return load_json(filename, dpath)
@@ -1,17 +1,168 @@
 #!/usr/bin/env python3
 
 import os
+import stat
 import json
 try:
     from _gojsonnet import evaluate_file, evaluate_snippet
 except ImportError:
     from _jsonnet import evaluate_file, evaluate_snippet
 from moo.util import clean_paths, resolve
+import moo.cache
 
+# The keyword arguments to evaluate_file() which may take part in a
+# cache key.  Others (eg native_callbacks) make an evaluation uncacheable.
+cacheable_kwds = ("tla_vars", "tla_codes", "ext_vars", "ext_codes")
 
-def try_path(path, rel):
+
+def merge_patch(target, patch):
     '''
-    Try to open a path
+    Return target with JSON merge patch applied as std.mergePatch().
+
+    See RFC 7386.
+    '''
+    if not isinstance(patch, dict):
+        return patch
+    target = dict(target) if isinstance(target, dict) else dict()
+    for key, val in patch.items():
+        if val is None:
+            target.pop(key, None)
+        else:
+            target[key] = merge_patch(target.get(key), val)
+    return target
+
+
+def native_toposort(edges):
+    '''
+    Return topologically sorted nodes given JSON text of an object
+    mapping each node to the array of nodes of its outgoing edges.
+
+    Nodes are visited in sorted order as by toposort.jsonnet.  Edges
+    to other than nodes are ignored.  If the graph is not a DAG the
+    error message is returned instead as Jsonnet does not receive
+    exceptions from native functions.
+    '''
+    from types import SimpleNamespace
+    import moo.oschema
+    edges = json.loads(edges)
+    graph = {node: SimpleNamespace(deps=edges[node]) for node in sorted(edges)}
+    try:
+        return moo.oschema.toposort(graph)
+    except ValueError as err:
+        return str(err)
+
+
+def native_hier(types):
+    '''
+    Return the types given as JSON text of an array placed into their
+    path/name hierarchy as by oschema.jsonnet hier().
+    '''
+    ret = None
+    for typ in json.loads(types):
+        patch = {typ["name"]: typ}
+        for part in reversed(typ["path"]):
+            patch = {part: patch}
+        ret = merge_patch(ret, patch)
+    return ret if ret is not None else dict()
+
+
+# Python functions which the Jsonnet code of moo may call via
+# std.native() and otherwise computes in Jsonnet.  Structured
+# arguments are passed as JSON text.
+native_callbacks = dict(
+    moo_toposort=(("edges",), native_toposort),
+    moo_hier=(("types",), native_hier),
+)
+
+
+def with_natives(kwds):
+    '''
+    Return evaluation keyword arguments adding moo native callbacks.
+    '''
+    kwds = dict(kwds)
+    kwds["native_callbacks"] = dict(native_callbacks,
+                                    **kwds.get("native_callbacks", {}))
+    return kwds
+
+
+class ImportCache(object):
+    '''
+    Process-wide cache of the content of files that Jsonnet imports.
+
+    Entries are validated against file modification time and size.  A
+    path which is not a file is also cached (a negative entry).  A
+    caller may skip validation of a path it has already checked, for
+    example during one evaluation, so that repeated lookups cost no
+    system calls.
+    '''
+
+    def __init__(self):
+        self.entries = dict()
+        self.hits = 0
+        self.misses = 0
+
+    def stamp(self, full_path):
+        '''
+        Return (mtime, size) of a file or None if not a file.
+        '''
+        try:
+            st = os.stat(full_path)
+        except OSError:
+            return None
+        if not stat.S_ISREG(st.st_mode):
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def read(self, full_path, check=True):
+        '''
+        Return content of file at full_path or None if not a file.
+
+        If check is False, an existing entry is used without validation.
+        '''
+        entry = self.entries.get(full_path)
+        if entry is not None and not check:
+            self.hits += 1
+            return entry[1]
+        stamp = self.stamp(full_path)
+        if entry is not None and entry[0] == stamp:
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        content = None
+        if stamp is not None:
+            try:
+                with open(full_path, "rb") as f:
+                    content = f.read()
+            except OSError:
+                stamp = None
+        self.entries[full_path] = (stamp, content)
+        return content
+
+    def clear(self):
+        '''
+        Forget all entries and reset counters.
+        '''
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        '''
+        Return dictionary of cache counters.
+        '''
+        return dict(hits=self.hits, misses=self.misses,
+                    entries=len(self.entries),
+                    negative=len([e for e in self.entries.values()
+                                  if e[0] is None]))
+
+
+# Shared by all evaluations in this process.
+import_cache = ImportCache()
+
+
+def import_path(path, rel):
+    '''
+    Return full path to an import of rel from path
     '''
     if not rel:
         raise RuntimeError('Got invalid filename (empty string).')
@@ -21,34 +172,130 @@ def try_path(path, rel):
         full_path = os.path.join(path, rel)
     if full_path[-1] == '/':
         raise RuntimeError('Attempted to import a directory')
+    return full_path
+
 
-    if not os.path.isfile(full_path):
+def try_path(path, rel):
+    '''
+    Try to open a path
+    '''
+    full_path = import_path(path, rel)
+    content = import_cache.read(full_path)
+    if content is None:
         raise RuntimeError(f"path is not a file: {full_path}")
-    with open(full_path, "rb") as f:
-        return full_path, f.read()
+    return full_path, content
+
+
+def import_digest(full_path):
+    '''
+    Return digest of the content of an imported file or None.
+    '''
+    content = import_cache.read(full_path)
+    if content is None:
+        return None
+    return moo.cache.content_digest(content)
 
 
 class ImportCallback(object):
 
-    def __init__(self, paths=()):
+    def __init__(self, paths=(), cache=None):
         self.paths = list(paths) + [
             os.path.join(os.path.dirname(__file__),
                          "jsonnet-code")]
         self.found = set()
+        # candidate paths tried which held no file
+        self.missed = set()
+        self.cache = import_cache if cache is None else cache
+        # paths validated against the cache by this callback
+        self.checked = set()
 
     def __call__(self, path, rel):
         paths = [path] + self.paths
         for maybe in paths:
             try:
-                full_path, content = try_path(maybe, rel)
+                full_path = import_path(maybe, rel)
             except RuntimeError:
                 continue
+            content = self.cache.read(full_path,
+                                      full_path not in self.checked)
+            self.checked.add(full_path)
             if content:
                 self.found.add(full_path)
                 return full_path, content
+            self.missed.add(full_path)
         raise RuntimeError('File not found')
 
 
+def code_digest():
+    '''
+    Return digest of the moo version and of the Python code behind the
+    native callbacks, which evaluations may depend on.
+    '''
+    global _code_digest
+    if _code_digest is None:
+        import moo
+        here = os.path.dirname(__file__)
+        _code_digest = moo.cache.digest(
+            moo.__version__, moo.cache.file_digest(__file__),
+            moo.cache.file_digest(os.path.join(here, "oschema.py")))
+    return _code_digest
+_code_digest = None
+
+
+def cache_key(fname, paths, kwds):
+    '''
+    Return key for caching evaluation of a file or None if uncacheable.
+
+    The key covers the file name and content, the search paths, the
+    TLA and external variables and the moo code, see code_digest().  Files the evaluation imports, and
+    candidates for imports which were not found, are checked
+    separately against the cache entry.
+    '''
+    if not moo.cache.enabled:
+        return None
+    if set(kwds).difference(cacheable_kwds):
+        return None
+    main = import_digest(fname)
+    if main is None:
+        return None
+    try:
+        return moo.cache.digest(code_digest(), fname, main, list(paths), kwds)
+    except TypeError:           # not JSON serializable
+        return None
+
+
+# Returned by cache_get() when there is no valid entry as null is
+# valid data.
+cache_miss = object()
+
+
+def cache_get(cache, key):
+    '''
+    Return cached data at key or cache_miss.
+
+    The entry is valid if all recorded import candidates are unchanged,
+    including those which did not exist.  A file newly shadowing an
+    import thus invalidates the entry.
+    '''
+    entry = cache.get(key)
+    if not entry or "tried" not in entry:
+        return cache_miss
+    for path, dig in entry["tried"].items():
+        if import_digest(path) != dig:
+            return cache_miss
+    return entry["data"]
+
+
+def cache_put(cache, key, tried, data):
+    '''
+    Store data at key along with digests of the import candidates.
+
+    A candidate which is not a file has a digest of None.
+    '''
+    tried = {path: import_digest(path) for path in tried}
+    cache.put(key, dict(tried=tried, data=data))
+
+
 def load(fname, paths=(), **kwds):
     '''
     Load a Jsonnet file.
@@ -60,16 +307,29 @@ def load(fname, paths=(), **kwds):
     - native_callbacks :: call python from Jsonnet
     - import_callbacks ::  help find imports
 
+    Unless disabled by moo.cache.enabled, the resulting data is cached
+    on disk and returned without evaluation as long as the file, all
+    files it imports and any TLA or external variables are unchanged.
+
     Application code should consider using moo.io.load().
     '''
     paths = clean_paths(paths)
     fname = resolve(fname, paths)
+    key = cache_key(fname, paths, kwds)
+    if key:
+        cache = moo.cache.DiskCache("jsonnet")
+        data = cache_get(cache, key)
+        if data is not cache_miss:
+            return data
     ic = ImportCallback(paths)
     try:
-        text = evaluate_file(fname, import_callback=ic, **kwds)
+        text = evaluate_file(fname, import_callback=ic, **with_natives(kwds))
     except RuntimeError as err:
         raise RuntimeError(f"in file: {fname}") from err
-    return json.loads(text)
+    data = json.loads(text)
+    if key:
+        cache_put(cache, key, ic.found | ic.missed, data)
+    return data
 
 
 def loads(jtext, paths=(), **kwds):
@@ -78,7 +338,8 @@ def loads(jtext, paths=(), **kwds):
     '''
     paths = clean_paths(paths)
     ic = ImportCallback(paths)
-    text = evaluate_snippet("<stdin>", jtext, import_callback=ic, **kwds)
+    text = evaluate_snippet("<stdin>", jtext, import_callback=ic,
+                            **with_natives(kwds))
     return json.loads(text)
 
 
@@ -89,7 +350,7 @@ def imports(fname, paths=(), **kwds):
     paths = clean_paths(paths)
     fname = resolve(fname, paths)
     ic = ImportCallback(paths)
-    evaluate_file(fname, import_callback=ic, **kwds)
+    evaluate_file(fname, import_callback=ic, **with_natives(kwds))
     ret = list(ic.found)
     ret.sort()
     return ret
@@ -1,5 +1,7 @@
 #!/usr/bin/env python3
+from collections import OrderedDict
 from .util import unflatten, pathify
+from .cache import digest
 
 # We 'borrow' jsonschema exception as our own
 from jsonschema.exceptions import ValidationError
@@ -42,7 +44,7 @@ def number(num):
     dtype = num.get("dtype", "f8")
     dt = dtype[0]
     size = int(dtype[1])           # fixme set constraints based on size
-    constraints = num.get("constraints", {})
+    constraints = dict(num.get("constraints", {})) # don't abuse input
     if dtype[0] in ('i', 'u'):
         js['type'] = "integer"
     if dtype[0] in ('u',):
@@ -113,16 +115,80 @@ def typify(o):
 
 
 def get_all_deps(flat, deps):
-    ret = set(deps)
-    for dep in deps:
-        fdep = flat[dep]
-        more = fdep.get('deps',[])
-        ret = ret.union(get_all_deps(flat,more))
+    '''
+    Return sorted list of deps and all of their deps in flat.
+
+    Each type is visited once no matter how many types depend on it.
+    '''
+    ret = set()
+    todo = list(deps)
+    while todo:
+        dep = todo.pop()
+        if dep in ret:
+            continue
+        ret.add(dep)
+        todo.extend(flat[dep].get('deps', []))
     ret = list(ret)
     ret.sort()
     return ret
 
 
+class Converter(object):
+    '''
+    Convert targets in one moo schema context to JSON Schema.
+
+    The context is flattened once and each of its types is converted
+    once no matter how many targets depend on it.  Converted types are
+    shared between results which must then not be modified.
+    '''
+
+    def __init__(self, context=None):
+        self.flat = None if context is None else pathify(context)
+        self.defs = dict()      # fqn to JSON Schema of type in context
+        self.closures = dict()  # deps to sorted deps with all their deps
+
+    def typify(self, fqn):
+        '''
+        Return JSON Schema for type in context.
+        '''
+        try:
+            return self.defs[fqn]
+        except KeyError:
+            pass
+        js = self.defs[fqn] = typify(self.flat[fqn])
+        return js
+
+    def all_deps(self, deps):
+        '''
+        Return sorted deps and all of their deps in context.
+        '''
+        key = tuple(deps)
+        try:
+            return self.closures[key]
+        except KeyError:
+            pass
+        ret = self.closures[key] = get_all_deps(self.flat, deps)
+        return ret
+
+    def __call__(self, target, id=None):
+        '''
+        Convert target as does convert().
+        '''
+        if '$schema' in target:
+            return target           # already JSON Schema
+
+        js = {"$schema": "http://json-schema.org/draft-07/schema#"}
+        if id is not None:
+            js['$id'] = id
+
+        if self.flat is not None:
+            deps = self.all_deps(target.get('deps',[]))
+            js['$defs'] = unflatten({n:self.typify(n) for n in deps})
+        last = typify(target)
+        js.update(last)
+        return js
+
+
 def convert(target, context=None, id=None):
     """
     Convert a target moo oschema in a moo schema context to a JSON Schema form or pass through JSON Schema.
@@ -131,53 +197,102 @@ def convert(target, context=None, id=None):
 
     @param context:a sequence or object with values that of individual moo schema.
 
+    To convert many targets in one context, make and call one Converter.
     """
+    return Converter(context)(target, id)
 
-    if '$schema' in target:
-        return target           # already JSON Schema
+# Compiled validators keyed by digest of validator name and schema.
+# Application may set the maximum number kept.
+compiled_validators = OrderedDict()
+max_compiled_validators = 256
 
-    js = {"$schema": "http://json-schema.org/draft-07/schema#"}
-    if id is not None:
-        js['$id'] = id
 
-    if context is not None:
-        flat = pathify(context)
-        deps = get_all_deps(flat, target.get('deps',[]))
-        flatdeps = {n:typify(flat[n]) for n in deps}
-        js['$defs'] = unflatten(flatdeps)
-    last = typify(target)
-    js.update(last)
-    return js
+def compile_jsonschema(jschema):
+    '''
+    Return a function validating a model against schema using jsonschema.
+    '''
+    from jsonschema.exceptions import SchemaError, best_match
+    from jsonschema.validators import validator_for
+    cls = validator_for(jschema)
+    try:
+        cls.check_schema(jschema)
+    except SchemaError as err:
+        raise ValidationError('invalid') from err
+    validator = cls(jschema, format_checker=format_checker)
+    def validate(model):
+        error = best_match(validator.iter_errors(model))
+        if error is not None:
+            raise error
+    return validate
 
-def make_validator_jsonschema():
+
+def compile_fastjsonschema(jschema):
     '''
-    Return a generic looking validator using jsonschema
+    Return a function validating a model against schema using fastjsonschema.
+
+    Errors are raised as ValidationError as with the jsonschema
+    validator.  The function returns the model with any schema defaults
+    filled in, as fastjsonschema does.
     '''
-    from jsonschema.exceptions import SchemaError
-    from jsonschema import validate as js_validate
-    def validate(model, schema={}):
+    import fastjsonschema
+    try:
+        fjs_validate = fastjsonschema.compile(jschema)
+    except fastjsonschema.JsonSchemaDefinitionException as err:
+        raise ValidationError('invalid') from err
+    def validate(model):
         try:
-            return js_validate(instance=model, schema=schema,format_checker=format_checker)
-        except SchemaError as err:
-            raise ValidationError('invalid') from err
+            return fjs_validate(model)
+        except fastjsonschema.JsonSchemaValueException as err:
+            raise ValidationError(err.message) from err
     return validate
 
-def make_validator_fastjsonschema():
-    from fastjsonschema import validate as fjs_validate
-    def validate(model, schema={}):
-        return fjs_validate(schema, model)
+
+def compile_validator(jschema, name=None):
+    '''
+    Return a function validating a model against JSON Schema.
+
+    The function raises ValidationError if a model is invalid and
+    otherwise returns what the validator does, for fastjsonschema the
+    model with schema defaults filled in.  The name selects the validator ("jsonschema" or "fastjsonschema").
+    Compiled functions are cached so that a schema equal to one seen
+    before is not compiled again.
+    '''
+    name = name or "jsonschema"
+    if name == "jsonschema":
+        compile = compile_jsonschema
+    elif name == "fastjsonschema":
+        compile = compile_fastjsonschema
+    else:
+        raise ValueError(f'unknown validator: {name}')
+
+    try:
+        key = digest(name, jschema)
+    except TypeError:           # not JSON serializable
+        return compile(jschema)
+
+    validate = compiled_validators.get(key)
+    if validate is not None:
+        compiled_validators.move_to_end(key)
+        return validate
+    validate = compile(jschema)
+    compiled_validators[key] = validate
+    while len(compiled_validators) > max_compiled_validators:
+        compiled_validators.popitem(last=False)
     return validate
 
+
 def make_validator(name=None):
-    if name is None or name == "jsonschema":
-        return make_validator_jsonschema()
-    if name == "fastjsonschema":
-        return make_validator_fastjsonschema()
-    raise ValueError(f'unknown validator: {name}')
+    '''
+    Return a generic looking validator function(model, schema).
+    '''
+    if name not in (None, "jsonschema", "fastjsonschema"):
+        raise ValueError(f'unknown validator: {name}')
+    def validate(model, schema={}):
+        return compile_validator(schema, name)(model)
+    return validate
 
 def validate(model, jschema, validator="jsonschema"):
     'Validate model against schema with validator'
     if isinstance(validator, str):
-        validator = make_validator(validator)
+        return compile_validator(jschema, validator)(model)
     return validator(model, jschema)
-
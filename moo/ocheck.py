@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+'''
+Compile moo oschema types directly into Python functions which check
+models.
+
+This is the "native" validator.  A model is checked by the rules of
+the JSON Schema which moo.jsonschema.convert() makes for a type but
+without making JSON Schema or resolving "$ref" when validating.  In
+addition, a number is checked to fit its dtype, as with moo.otypes.
+
+A check function returns None or raises ValidationError.
+
+    >>> check = Compiler(context)(target)
+    >>> check(model)
+'''
+import re
+from fractions import Fraction
+from moo.util import pathify, flatpath
+from moo.jsonschema import ValidationError, format_checker, compile_validator
+
+# Largest finite value of dtype f4.
+_f4_max = 3.4028234663852886e38
+
+
+def dtype_bounds(dtype):
+    '''
+    Return (lowest, highest) value allowed by a number dtype.
+    '''
+    kind = dtype[0]
+    if kind == 'i':
+        bits = 8*int(dtype[1:])
+        return -2**(bits-1), 2**(bits-1) - 1
+    if kind == 'u':
+        bits = 8*int(dtype[1:])
+        return 0, 2**bits - 1
+    if dtype == 'f4':
+        return -_f4_max, _f4_max
+    return float('-inf'), float('inf')
+
+
+def not_multiple(val, mof):
+    '''
+    Return True if val is not a multiple of mof as by JSON Schema.
+    '''
+    if isinstance(mof, float):
+        quotient = val / mof
+        try:
+            return int(quotient) != quotient
+        except OverflowError:
+            return (Fraction(val) / Fraction(mof)).denominator != 1
+    return val % mof != 0
+
+
+def is_number(val):
+    'Return True if val is a JSON number'
+    return isinstance(val, (int, float)) and not isinstance(val, bool)
+
+
+def is_integer(val):
+    'Return True if val is a JSON integer'
+    if isinstance(val, float):
+        return val.is_integer()
+    return isinstance(val, int) and not isinstance(val, bool)
+
+
+def number(ost, compiler):
+    '''
+    Return check of number type.
+    '''
+    dtype = ost.get("dtype", "f8")
+    integer = dtype[0] in ('i', 'u')
+    cons = ost.get("constraints", None) or {}
+    lo, hi = dtype_bounds(dtype)
+    mini = max(lo, cons.get("minimum", lo))
+    maxi = min(hi, cons.get("maximum", hi))
+    emini = cons.get("exclusiveMinimum", float('-inf'))
+    emaxi = cons.get("exclusiveMaximum", float('inf'))
+    mof = cons.get("multipleOf", None)
+
+    def error(val):
+        if not (is_integer(val) if integer else is_number(val)):
+            kind = "integer" if integer else "number"
+            return ValidationError(f'{val!r} is not of type {kind!r}')
+        if val < mini:
+            return ValidationError(f'{val!r} is less than the minimum of {mini!r}')
+        if val > maxi:
+            return ValidationError(f'{val!r} is greater than the maximum of {maxi!r}')
+        if val <= emini:
+            return ValidationError(f'{val!r} is less than or equal to the minimum of {emini!r}')
+        if val >= emaxi:
+            return ValidationError(f'{val!r} is greater than or equal to the maximum of {emaxi!r}')
+        if mof is not None and not_multiple(val, mof):
+            return ValidationError(f'{val!r} is not a multiple of {mof!r}')
+        return None
+
+    def check(val):
+        cls = val.__class__
+        if cls is int or (cls is float and (not integer or val.is_integer())):
+            if mini <= val <= maxi and emini < val < emaxi:
+                if mof is None or not not_multiple(val, mof):
+                    return
+        err = error(val)        # slow path, eg for int subclasses
+        if err is not None:
+            raise err
+    return check
+
+
+def string(ost, compiler):
+    '''
+    Return check of string type.
+    '''
+    pattern = ost.get("pattern", None)
+    search = re.compile(pattern).search if pattern else None
+    fmt = ost.get("format", None)
+    if fmt not in getattr(format_checker, "checkers", ()):
+        fmt = None              # unknown formats are not checked
+
+    def check(val):
+        if val.__class__ is not str and not isinstance(val, str):
+            raise ValidationError(f'{val!r} is not of type \'string\'')
+        if search and not search(val):
+            raise ValidationError(f'{val!r} does not match {pattern!r}')
+        if fmt and not format_checker.conforms(val, fmt):
+            raise ValidationError(f'{val!r} is not a {fmt!r}')
+    return check
+
+
+def boolean(ost, compiler):
+    '''
+    Return check of boolean type.
+    '''
+    def check(val):
+        if val is not True and val is not False:
+            raise ValidationError(f'{val!r} is not of type \'boolean\'')
+    return check
+
+
+def enum(ost, compiler):
+    '''
+    Return check of enum type.
+    '''
+    symbols = frozenset(ost["symbols"])
+    listed = list(ost["symbols"])
+
+    def check(val):
+        try:
+            if val in symbols and isinstance(val, str):
+                return
+        except TypeError:       # unhashable
+            pass
+        raise ValidationError(f'{val!r} is not one of {listed!r}')
+    return check
+
+
+def any(ost, compiler):
+    '''
+    Return check of any type.
+    '''
+    def check(val):
+        pass
+    return check
+
+
+def sequence(ost, compiler):
+    '''
+    Return check of sequence type.
+    '''
+    item = compiler.check(ost["items"])
+
+    def check(val):
+        if val.__class__ is not list and not isinstance(val, list):
+            raise ValidationError(f'{val!r} is not of type \'array\'')
+        for ind, one in enumerate(val):
+            try:
+                item(one)
+            except ValidationError as err:
+                err.path.appendleft(ind)
+                raise
+    return check
+
+
+def record(ost, compiler):
+    '''
+    Return check of record type.
+    '''
+    fields = [(f["name"], compiler.check(f["item"])) for f in ost["fields"]]
+
+    def check(val):
+        if val.__class__ is not dict and not isinstance(val, dict):
+            raise ValidationError(f'{val!r} is not of type \'object\'')
+        for name, item in fields:
+            if name in val:
+                try:
+                    item(val[name])
+                except ValidationError as err:
+                    err.path.appendleft(name)
+                    raise
+    return check
+
+
+def anyOf(ost, compiler):
+    '''
+    Return check of anyOf type.
+    '''
+    checks = [compiler.check(t) for t in ost["types"]]
+
+    def check(val):
+        for one in checks:
+            try:
+                one(val)
+            except ValidationError:
+                continue
+            return
+        raise ValidationError(f'{val!r} is not valid under any of the given schemas')
+    return check
+
+
+def allOf(ost, compiler):
+    '''
+    Return check of allOf type.
+    '''
+    checks = [compiler.check(t) for t in ost["types"]]
+
+    def check(val):
+        for one in checks:
+            one(val)
+    return check
+
+
+def oneOf(ost, compiler):
+    '''
+    Return check of oneOf type.
+    '''
+    checks = [compiler.check(t) for t in ost["types"]]
+
+    def check(val):
+        count = 0
+        for one in checks:
+            try:
+                one(val)
+            except ValidationError:
+                continue
+            count += 1
+        if count == 0:
+            raise ValidationError(f'{val!r} is not valid under any of the given schemas')
+        if count > 1:
+            raise ValidationError(f'{val!r} is valid under each of {count} of the given schemas')
+    return check
+
+
+schema_checks = dict(boolean=boolean, number=number, string=string,
+                     enum=enum, any=any, sequence=sequence, record=record,
+                     anyOf=anyOf, allOf=allOf, oneOf=oneOf)
+
+
+class Compiler(object):
+    '''
+    Compile checks of targets in one moo schema context.
+
+    Each type of the context is compiled once no matter how many
+    targets depend on it.
+    '''
+
+    def __init__(self, context=None):
+        self.flat = dict() if context is None else pathify(context)
+        self.checks = dict()    # fqn to check
+        self.compiling = set()
+
+    def compile(self, ost):
+        '''
+        Return check of the oschema type.
+        '''
+        try:
+            make = schema_checks[ost["schema"]]
+        except KeyError:
+            raise ValueError(f'unsupported schema class for native validation: {ost["schema"]}') from None
+        return make(ost, self)
+
+    def check(self, fqn):
+        '''
+        Return check of the type in the context by its fully qualified name.
+        '''
+        try:
+            return self.checks[fqn]
+        except KeyError:
+            pass
+        if fqn in self.compiling: # recursive type
+            checks = self.checks
+            return lambda val: checks[fqn](val)
+        try:
+            ost = self.flat[fqn]
+        except KeyError:
+            raise ValueError(f'unknown type: {fqn}') from None
+        self.compiling.add(fqn)
+        try:
+            check = self.checks[fqn] = self.compile(ost)
+        finally:
+            self.compiling.discard(fqn)
+        return check
+
+    def __call__(self, target):
+        '''
+        Return a function checking a model against the target.
+
+        A target given as JSON Schema is checked by jsonschema.  An
+        error from a nested value gives its location in the message.
+        '''
+        if '$schema' in target:
+            return compile_validator(target, "jsonschema")
+        fqn = flatpath(target)
+        if self.flat.get(fqn) is target:
+            inner = self.check(fqn)
+        else:
+            inner = self.compile(target)
+
+        def check(model):
+            try:
+                inner(model)
+            except ValidationError as err:
+                if err.path:
+                    where = '/'.join(str(p) for p in err.path)
+                    err.message = f'{err.message} at /{where}'
+                raise
+        return check
+
+
+def compile_check(target, context=None):
+    '''
+    Return a function checking a model against target in context.
+    '''
+    return Compiler(context)(target)
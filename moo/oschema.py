@@ -11,24 +11,99 @@ defined through schema classes.
 '''
 
 
+import weakref
+from collections.abc import MutableMapping
 import numpy
 from .jsonschema import validate, ValidationError
 
 
-# this holds all known types
-known_types = dict()
+class TypeRegistry(MutableMapping):
+    '''
+    A mapping of fully qualified type name to type.
+
+    Types register themselves on construction and resolve types they
+    refer to by name through their registry.  A later type of the same
+    name replaces an earlier one.
+
+    If weak, a type is held only as long as something else holds it,
+    eg a list of types returned by typify().  Types which are no
+    longer used then leave the registry with no need to evict them.
+    '''
+
+    def __init__(self, weak=False):
+        self.weak = weak
+        self._types = weakref.WeakValueDictionary() if weak else dict()
+
+    def __repr__(self):
+        return '<TypeRegistry%s %d types>' % (" weak" if self.weak else "",
+                                             len(self))
+
+    def __getitem__(self, fqn):
+        return self._types[fqn]
+
+    def __setitem__(self, fqn, typ):
+        self._types[fqn] = typ
+
+    def __delitem__(self, fqn):
+        del self._types[fqn]
+
+    def __iter__(self):
+        return iter(list(self._types))
+
+    def __len__(self):
+        return len(self._types)
+
+    def add(self, typ):
+        '''
+        Register and return type.
+        '''
+        self[typ.fqn] = typ
+        return typ
+
+    def evict(self, path=()):
+        '''
+        Remove all types at or under the path and return their number.
+
+        The path may be a list or a dot-delimited string.  An empty path
+        removes all types.
+        '''
+        if isinstance(path, str):
+            path = path.split(".")
+        prefix = '.'.join(p for p in path if p)
+        if not prefix:
+            count = len(self._types)
+            self._types.clear()
+            return count
+        gone = [fqn for fqn in self
+                if fqn == prefix or fqn.startswith(prefix + '.')]
+        for fqn in gone:
+            self._types.pop(fqn, None)
+        return len(gone)
+
+    def clear(self):
+        self._types.clear()
+
+
+# Types are registered here unless given another registry.
+default_registry = TypeRegistry()
+
+# Old name of the default registry.
+known_types = default_registry
 
 
 class BaseType(object):
     name = None
     doc = ""
     path = ()
+    registry = default_registry
 
-    def __init__(self, name=None, doc="", path=()):
+    def __init__(self, name=None, doc="", path=(), registry=None):
         self.name = name
         self.doc = doc
         self.path = [p for p in path if p]
-        known_types[self.fqn] = self
+        if registry is not None:
+            self.registry = registry
+        self.registry.add(self)
 
     @property
     def deps(self):
@@ -86,8 +161,8 @@ class Number(BaseType):
     'A number type'
     dtype = "i4"
 
-    def __init__(self, name=None, dtype='i4', doc="", path=()):
-        super().__init__(name, doc, path)
+    def __init__(self, name=None, dtype='i4', doc="", path=(), registry=None):
+        super().__init__(name, doc, path, registry)
         self.dtype = dtype
 
     def to_dict(self):
@@ -113,8 +188,9 @@ class String(BaseType):
     pattern = None
     format = None
 
-    def __init__(self, name=None, pattern=None, format=None, doc="", path=()):
-        super().__init__(name, doc, path)
+    def __init__(self, name=None, pattern=None, format=None, doc="", path=(),
+                 registry=None):
+        super().__init__(name, doc, path, registry)
         self.pattern = pattern
         self.format = format
 
@@ -140,8 +216,8 @@ class Sequence(BaseType):
     'A sequence/array/vector type of one type'
     items = None
 
-    def __init__(self, name=None, items=None, doc="", path=()):
-        super().__init__(name, doc, path)
+    def __init__(self, name=None, items=None, doc="", path=(), registry=None):
+        super().__init__(name, doc, path, registry)
         self.items = str(items)
 
     @property
@@ -158,12 +234,12 @@ class Sequence(BaseType):
 
     @property
     def js(self):
-        items = known_types[self.items]
+        items = self.registry[self.items]
         return dict(type="array", items=items.js)
 
     def __call__(self, val):
         validate(val, self.js)
-        items = known_types[self.items]
+        items = self.registry[self.items]
         return [items(v) for v in val]
 
 
@@ -174,11 +250,17 @@ class Field(object):
     default = None
     doc = ""
 
-    def __init__(self, name=None, item=None, default=None, doc=""):
+    # The registry resolving the item type.  Set by the record of the
+    # field if not given.
+    registry = None
+
+    def __init__(self, name=None, item=None, default=None, doc="",
+                 registry=None):
         self.name = name
         self.item = str(item)
         self.default = default
         self.doc = doc
+        self.registry = registry
 
     def __str__(self):
         return self.name
@@ -187,7 +269,7 @@ class Field(object):
         return '<Field "%s" %s [%s]>' % (self.name, self.item, self.default)
 
     def __call__(self, val):
-        item = known_types[self.item]
+        item = (self.registry or default_registry)[self.item]
         return item(val)
 
     def to_dict(self):
@@ -197,9 +279,12 @@ class Record(BaseType):
     'A thing with named/typed fields like a struct or a class'
     fields = ()
 
-    def __init__(self, name=None, fields=None, doc="", path=()):
-        super().__init__(name, doc, path)
+    def __init__(self, name=None, fields=None, doc="", path=(), registry=None):
+        super().__init__(name, doc, path, registry)
         self.fields = fields
+        for field in fields or ():
+            if field.registry is None:
+                field.registry = self.registry
 
     @property
     def deps(self):
@@ -224,7 +309,7 @@ class Record(BaseType):
     def js(self):
         fjs = dict()
         for field in self.fields:
-            item = known_types[field.item]
+            item = self.registry[field.item]
             fjs[field.name] = item.js
         return dict(type="object", properties=fjs)
 
@@ -249,8 +334,9 @@ class Any(BaseType):
 
 class Enum(BaseType):
 
-    def __init__(self, name=None, symbols=(), default=None, doc="", path=()):
-        super().__init__(name, doc, path)
+    def __init__(self, name=None, symbols=(), default=None, doc="", path=(),
+                 registry=None):
+        super().__init__(name, doc, path, registry)
         self.symbols = symbols
         if default is None:
             default = symbols[0]
@@ -276,11 +362,13 @@ def isin(me, you):
 
 class Namespace(BaseType):
 
-    def __init__(self, name=None, path=(), doc="", **parts):
+    def __init__(self, name=None, path=(), doc="", registry=None, **parts):
         n = name.split(".")
         self.name = n.pop(-1)
         self.path = list(path) + n
         self.doc = doc
+        if registry is not None:
+            self.registry = registry
         self.parts = parts
 
     def __repr__(self):
@@ -290,7 +378,7 @@ class Namespace(BaseType):
         '''
         Make and return a field
         '''
-        return Field(name, item, default, doc)
+        return Field(name, item, default, doc, self.registry)
 
     def normalize(self, key):
         '''
@@ -318,6 +406,7 @@ class Namespace(BaseType):
     def _make(self, cls, name, *args, **kwds):
         if "path" not in kwds:
             kwds["path"] = self.fqnp
+        kwds.setdefault("registry", self.registry)
         ret = cls(name, *args, **kwds)
         self.parts[name] = ret
         return ret
@@ -344,7 +433,7 @@ class Namespace(BaseType):
         if first in self.parts:
             ns = self.parts[first]
         else:
-            ns = Namespace(first, self.fqnp)
+            ns = Namespace(first, self.fqnp, registry=self.registry)
             self.parts[first] = ns
         for sp in subpath:
             ns = ns.namespace(sp)
@@ -417,9 +506,11 @@ def schema_class(clsname):
     raise KeyError(f'no such schema class: "{clsname}"')
 
 
-def from_dict(d):
+def from_dict(d, registry=None):
     '''
     Return a schema object give a dictionary representation as made from .to_dict()
+
+    The type is registered in the registry, by default the default_registry.
     '''
     d = dict(d)
     schema = d.pop("schema")
@@ -431,22 +522,15 @@ def from_dict(d):
         doc = d.pop("doc", "")
         parts = dict()
         for n, p in d.items():   # rest of d is parts
-            parts[n] = from_dict(p)
-        return Namespace(name, path, doc, **parts)
-
-    # otherwise make a namespace to hold the building of the type
-    if path:
-        nsname = path.pop(-1)
-        ns = Namespace(nsname, path)
-    else:
-        ns = Namespace("")
-    meth = getattr(ns, schema)
+            parts[n] = from_dict(p, registry)
+        return Namespace(name, path, doc, registry, **parts)
+
+    cls = schema_class(schema)
     if schema == "record":      # little help
-        fields = [Field(**f) for f in d.pop("fields", [])]
+        fields = [Field(registry=registry, **f) for f in d.pop("fields", [])]
         d["fields"] = fields
 
-    ret = meth(name, **d)
-    return ret
+    return cls(name, path=path, registry=registry, **d)
 
 def graph(types):
     '''
@@ -463,45 +547,77 @@ def toposort(graph):
 
     Graph is assumed to be an object such as returned by graph()
 
+    Nodes are visited depth first in the order of the graph and of
+    their deps, each type following its deps.  Time is linear in the
+    number of nodes and deps and deep graphs do not recurse.
+
+    Raise ValueError giving a cycle if the graph is not a DAG.
+
     https://en.wikipedia.org/wiki/Topological_sorting#Depth-first_search
     '''
     ret = list()
     marks = dict()
-    nodes = list(graph.keys())
-
-    def visit(node):
-        if node not in graph:
-            return
-
-        mark = marks.get(node, None)
-        if mark == "perm":
-            return
-        if mark == "temp":
-            raise ValueError("type dependency graph is not a DAG")
-
-        marks[node] = "temp"
-
-        for dep in graph[node].deps:
-            visit(dep)
-        marks[node] = "perm"
-        ret.append(node)
 
-    while nodes:
-        visit(nodes.pop(0))
-        nodes = [n for n in nodes if n not in marks]
+    for top in graph:
+        if top in marks:
+            continue
+        marks[top] = "temp"
+        stack = [(top, iter(graph[top].deps))]
+        while stack:
+            node, deps = stack[-1]
+            for dep in deps:
+                if dep not in graph:
+                    continue
+                mark = marks.get(dep, None)
+                if mark == "perm":
+                    continue
+                if mark == "temp":
+                    path = [one for one, _ in stack]
+                    cycle = path[path.index(dep):] + [dep]
+                    raise ValueError("type dependency graph is not a DAG: " +
+                                     " -> ".join(cycle))
+                marks[dep] = "temp"
+                stack.append((dep, iter(graph[dep].deps)))
+                break
+            else:
+                stack.pop()
+                marks[node] = "perm"
+                ret.append(node)
 
     return ret
 
 
-def typify(data):
+def toposort_levels(graph):
+    '''
+    Given a graph of types, return a list of levels of nodes.
+
+    The nodes of a level depend only on nodes of lower levels and may be
+    processed independently of each other once lower levels are done.
+    Nodes of a level are in the order given by toposort().
+    '''
+    levels = list()
+    level = dict()
+    for node in toposort(graph):
+        deps = [level[dep] for dep in graph[node].deps if dep in graph]
+        lev = max(deps) + 1 if deps else 0
+        level[node] = lev
+        if lev == len(levels):
+            levels.append(list())
+        levels[lev].append(node)
+    return levels
+
+
+def typify(data, registry=None):
     '''
     Return data assured to be an oschema object or array of such.
+
+    New objects are registered in the registry, see from_dict().
     '''
     if isinstance(data, list):
-        return [typify(one) for one in data]
+        return [typify(one, registry) for one in data]
 
     if isinstance(data, dict):
-        return from_dict(data)
+        return from_dict(data, registry)
 
     if isinstance(data, BaseType):
         return data
@@ -532,7 +648,7 @@ def depsort(g):
     return [g[n] for n in toposort(g)]
 
 
-def namespacify(data):
+def namespacify(data, registry=None):
     '''
     Turn array of type data structures into in a namespace hiearchy of
     schema objects based on their paths.
@@ -541,9 +657,9 @@ def namespacify(data):
 
     moo [...] render -t moo.oschema.namespacify [...]
     '''
-    top = Namespace("")
+    top = Namespace("", registry=registry)
     for dat in data:
-        typ = from_dict(dat)
+        typ = from_dict(dat, registry)
         top.add(typ)
     return top
 
@@ -3,13 +3,26 @@
 Produce instances of types defined by moo oschema.
 '''
 import os
+import re
+import copy
 import json
+import math
+import struct
+import copyreg
+import threading
+import contextlib
+from collections.abc import Mapping
+from importlib.util import cache_from_source
 import numpy
-from abc import ABC, abstractmethod
+from abc import ABCMeta, abstractmethod
 from importlib import import_module
+import moo.cache
 from moo.modutil import module_at
 from moo.io import load as load_file
-from .jsonschema import validate, ValidationError
+from .jsonschema import ValidationError, format_checker
+
+_pack_f4 = struct.Struct("f").pack
+_unpack_f4 = struct.Struct("f").unpack
 
 
 def get_deps(deps=None, **ost):
@@ -44,7 +57,11 @@ def deps_code(**ost):
 def get_type(pathname):
     '''
     Return a type by its fully qualified name
+
+    A type registered by make_types(lazy=True) is made here if needed.
     '''
+    if pathname in pending:
+        return make_pending(pathname)
     if '.' in pathname:
         path, name = pathname.rsplit('.', 1)
         mod = import_module(path)
@@ -59,18 +76,211 @@ def classify(source, **ost):
     source = deps_code(**ost) + '\n' + source
     code = compile(source, "<{schema} {name}>".format(**ost), "exec")
     exec(code, globals())
-    class_name = ost["name"]
-    cls = globals()[class_name]
+    return _classified(globals()[ost["name"]], ost)
+
+
+def _classified(cls, ost):
+    '''
+    Attach object schema type to class, place class at its path and
+    register its object schema type.
+    '''
     setattr(cls, "_ost", ost)
+    cls._setup()
     path = ost.get("path", None)
     if path:
         mod = module_at(path)
-        setattr(mod, class_name, cls)
+        setattr(mod, cls.__name__, cls)
         cls.__module__ = mod.__name__
+    fqn = type_name(ost)
+    registry[fqn] = (ost, "__slots__" in vars(cls))
+    pending.pop(fqn, None)
     return cls
 
 
-class BaseType(ABC):
+# Fully qualified type name to (ost, compact) of every type made in
+# this process.  See restore_type().
+registry = dict()
+
+# Fully qualified type name to (ost, compact) of types registered but
+# not yet made.  See make_types() with lazy=True.
+pending = dict()
+_pending_lock = threading.RLock()
+
+
+def make_pending(fqn):
+    '''
+    Make and return the pending type of the fully qualified name.
+    '''
+    with _pending_lock:
+        try:
+            ost, compact = pending[fqn]
+        except KeyError:        # made by another thread
+            return get_type(fqn)
+        return make_type(compact, **copy.deepcopy(ost))
+
+
+def _lazy_getattr(mod):
+    '''
+    Return a module __getattr__ making pending types of the module.
+    '''
+    chained = getattr(mod, "__getattr__", None)
+    if getattr(chained, "_lazy_types", False):
+        return chained
+
+    def __getattr__(name):
+        fqn = f'{mod.__name__}.{name}'
+        if fqn in pending:
+            return make_pending(fqn)
+        if chained:
+            return chained(name)
+        raise AttributeError(f'module {mod.__name__!r} has no attribute {name!r}')
+    __getattr__._lazy_types = True
+    return __getattr__
+
+
+def register_type(ost, compact=False):
+    '''
+    Register an object schema type to be made on first use.
+
+    The type is made when first got from its module, eg by import, or
+    by get_type().  Return its fully qualified name.
+    '''
+    fqn = type_name(ost)
+    if registry.get(fqn) == (ost, compact):
+        return fqn              # already made
+    path = ost.get("path", None)
+    with _pending_lock:
+        pending[fqn] = (ost, compact)
+        if path:
+            mod = module_at(path)
+            mod.__getattr__ = _lazy_getattr(mod)
+            mod.__dict__.pop(ost["name"], None)
+        else:
+            globals().pop(ost["name"], None)
+    return fqn
+
+
+class LazyTypes(Mapping):
+    '''
+    Mapping of type name to type which makes a type on first access.
+
+    This is returned by make_types(lazy=True).
+    '''
+
+    def __init__(self, names):
+        self._names = dict(names)   # key to fully qualified name
+
+    def __getitem__(self, key):
+        return get_type(self._names[key])
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def __len__(self):
+        return len(self._names)
+
+
+def type_closure(fqn):
+    '''
+    Return list of (fqn, ost, compact) for the registered type and all
+    of its registered dependencies, dependencies first.
+    '''
+    ret = list()
+    seen = set()
+    todo = [(fqn, False)]
+    while todo:
+        one, done = todo.pop()
+        if done:
+            ret.append((one,) + (registry.get(one) or pending[one]))
+            continue
+        if one in seen or not (one in registry or one in pending):
+            continue
+        seen.add(one)
+        todo.append((one, True))
+        ost = (registry.get(one) or pending[one])[0]
+        todo.extend((dep, False) for dep in reversed(get_deps(**ost)))
+    return ret
+
+
+def restore_type(fqn, closure):
+    '''
+    Return the type of the fully qualified name, first making any type
+    in closure which this process does not already have.
+
+    The closure is as returned by type_closure().  This is how a type
+    and its instances are unpickled, eg in a worker process.
+    '''
+    missing = [(ost, compact) for one, ost, compact in closure
+               if registry.get(one) != (ost, compact)]
+    for ost, _ in missing:    # types may import modules of each other
+        if ost.get("path", None):
+            module_at(ost["path"])
+    for ost, compact in missing:
+        make_type(compact, **copy.deepcopy(ost))
+    return get_type(fqn)
+
+
+def reduce_type(cls):
+    '''
+    Reduce a type for pickling.
+
+    A type made from an object schema type pickles with its closure of
+    object schema types so that it is remade on unpickling as needed.
+    Other types pickle by name as usual.
+    '''
+    ost = vars(cls).get("_ost", None)
+    if ost is None:
+        return cls.__qualname__
+    fqn = type_name(ost)
+    return restore_type, (fqn, type_closure(fqn))
+
+
+# Per thread state, see deferred().
+_state = threading.local()
+
+
+@contextlib.contextmanager
+def deferred():
+    '''
+    Context in which record fields accept values without validation.
+
+    A field value set in this context is validated when it is first
+    needed, eg by pod(), or by an explicit validate() of the record.
+    This saves validating values which are later overwritten.
+
+    >>> with deferred():
+    ...     rec = MyRecord(**raw_values)
+    ...     rec.field = other
+    >>> rec.validate()
+    '''
+    prev = getattr(_state, "deferred", False)
+    _state.deferred = True
+    try:
+        yield
+    finally:
+        _state.deferred = prev
+
+
+def deferring():
+    '''
+    Return True if in a deferred() context.
+    '''
+    return getattr(_state, "deferred", False)
+
+
+class _OTypeMeta(ABCMeta):
+    '''
+    Metaclass of all otypes, see reduce_type().
+    '''
+
+
+copyreg.pickle(_OTypeMeta, reduce_type)
+
+
+class BaseType(metaclass=_OTypeMeta):
+
+    # Types made in compact mode add slots and have no instance dict.
+    __slots__ = ()
 
     _value = None
 
@@ -90,31 +300,112 @@ class BaseType(ABC):
         'The object schema type'
         return dict(self._ost)
 
+    @classmethod
+    def _setup(cls):
+        '''
+        Prepare class level data once the object schema type is attached.
+        '''
+
+    def validate(self):
+        '''
+        Raise an exception if value is invalid, else return self.
+
+        Most values are validated when set.  Records also validate any
+        values set in a deferred() context.
+        '''
+        return self
+
+
+class _Raw(BaseType):
+    '''
+    A record field value held as given until it is needed.
+    '''
+    __slots__ = ("_type", "_given", "_obj")
+
+    def __init__(self, typ, given):
+        self._type = typ
+        self._given = given
+        self._obj = None
+
+    def __repr__(self):
+        return '<raw %s: %r>' % (self._type.__name__, self._given)
+
+    def resolve(self):
+        '''
+        Return the value made as an instance of its type.
+        '''
+        if self._obj is None:
+            self._obj = self._type(self._given)
+        return self._obj
+
+    def pod(self):
+        return self.resolve().pod()
+
+    def update(self, val):
+        self._given = val
+        self._obj = None
+
 
 class _Record(BaseType):
     '''
     The oschema record class in Python.
     '''
+    __slots__ = ()
 
     def __repr__(self):
         return '<record %s, fields: {%s}>' % \
             (self.__class__.__name__, ', '.join(self.field_names))
 
+    # Set for each record class by _setup().
+    _fields = None              # field name to field
+    _field_names = ()
+    _item_types = None          # field name to type, resolved on first use
+    _default_pods = None        # field name to pod of field default
+
+    @classmethod
+    def _setup(cls):
+        fields = cls._ost['fields']
+        cls._fields = {one['name']: one for one in fields}
+        cls._field_names = [one['name'] for one in fields]
+        cls._item_types = dict()
+        cls._default_pods = dict()
+
+    @classmethod
+    def _item_type(cls, fname):
+        'Return the type of a field'
+        try:
+            return cls._item_types[fname]
+        except KeyError:
+            pass
+        typ = get_type(cls._fields[fname]['item'])
+        cls._item_types[fname] = typ
+        return typ
+
+    @classmethod
+    def _default_pod(cls, fname):
+        'Return the default value of a field as plain old data'
+        try:
+            val = cls._default_pods[fname]
+        except KeyError:
+            val = cls._item_type(fname)(cls._fields[fname]['default']).pod()
+            cls._default_pods[fname] = val
+        if isinstance(val, (dict, list)):
+            return copy.deepcopy(val)
+        return val
+
     def pod(self):
         '''
         Return record as plain old data.
 
         Will perform validation.
         '''
-        # print(self.field_names)
         ret = dict()
-        for fname, field in self.fields.items():
-            if fname in self._value:
+        for fname, field in self._fields.items():
+            if self._has(fname):
                 ret[fname] = getattr(self, fname) # this calls pod() on attr
                 continue
             if "default" in field:
-                item = get_type(field['item'])
-                ret[fname] = item(field['default']).pod()
+                ret[fname] = self._default_pod(fname)
                 continue
             if field.get("optional", False):
                 continue
@@ -159,15 +450,15 @@ class _Record(BaseType):
     @property
     def field_names(self):
         'Return list of field names'
-        return [one['name'] for one in self._ost['fields']]
+        return list(self._field_names)
 
     @property
     def fields(self):
         'Return mapping of field name to field dict'
-        return {one['name']: one for one in self._ost['fields']}
+        return dict(self._fields)
 
     def _from_dict(self, mapping):
-        fields = self.fields
+        fields = self._fields
         for fname, fval in mapping.items():
             try:
                 field = fields[fname]
@@ -185,26 +476,104 @@ class _Record(BaseType):
                 continue
 
             # intern as type
-            ItemType = get_type(field['item'])
+            ItemType = self._item_type(fname)
 
             if isinstance(fval, BaseType) and not isinstance(fval, ItemType) and not issubclass(ItemType, _Any):
                 cname = self.__class__.__name__
                 tname = type(fval)
                 raise ValueError(f'{cname}.{fname}: got {tname}, want {ItemType}')
 
-            self._value[fname] = ItemType(fval)
+            self._store(fname, self._field_value(fname, fval))
 
     def _from_self(self, other):
         # we don't invoke pod() here as we allow incomplete records
         # and pod() will assert completeness.
-        fields = self.field_names
-        for key, val in other._value.items():
+        fields = self._fields
+        for key, val in other._items():
             if key in fields:
-                self._value[key] = val
+                self._put(key, val)
+
+    def _field_value(self, fname, value):
+        'Return value to store in a field, unvalidated if deferring'
+        if deferring():
+            return _Raw(self._item_type(fname), value)
+        return self._item_type(fname)(value)
+
+    def validate(self):
+        '''
+        Validate all fields, including values set in a deferred()
+        context, and assert required fields are set.  Return self.
+        '''
+        for fname, stored in list(self._items()):
+            if isinstance(stored, _Raw):
+                stored = stored.resolve()
+                self._store(fname, stored)
+            if isinstance(stored, BaseType):
+                stored.validate()
+        for fname, field in self._fields.items():
+            if self._has(fname) or "default" in field:
+                continue
+            if field.get("optional", False):
+                continue
+            raise AttributeError("%s missing required field %s" %
+                                 (self.__class__.__name__, fname))
+        return self
+
+    def _has(self, fname):
+        'Return True if field is set'
+        return fname in self._value
+
+    def _items(self):
+        'Return (field name, stored value) pairs of set fields'
+        return self._value.items()
+
+    def _put(self, fname, val):
+        'Set a field to a value as held by _items()'
+        self._value[fname] = val
+
+    def _store(self, fname, obj):
+        'Set a field to an instance of its type'
+        self._value[fname] = obj
 
     # baseclass provides __init__, field properties and ._ost
 
 
+class _CompactRecord(_Record):
+    '''
+    The oschema record class made in compact mode.
+
+    Fields are held in slots, scalar fields as their plain old data.
+    '''
+    __slots__ = ()
+
+    def _has(self, fname):
+        return hasattr(self, "_v_" + fname)
+
+    def _items(self):
+        for fname in self._field_names:
+            try:
+                yield fname, getattr(self, "_v_" + fname)
+            except AttributeError:
+                continue
+
+    def _put(self, fname, val):
+        setattr(self, "_v_" + fname, val)
+
+    def _store(self, fname, obj):
+        if isinstance(obj, _scalar_types):
+            obj = obj.pod()
+        setattr(self, "_v_" + fname, obj)
+
+
+def _value_slots(compact):
+    '''
+    Return class body line giving slots of a non-record type.
+    '''
+    if compact:
+        return '__slots__ = ("_value",)'
+    return ''
+
+
 def field_default_value(value, pathname):
     '''
     Return value coerced into type given by pathname
@@ -222,9 +591,11 @@ def field_default_value(value, pathname):
     return value
 
 
-def record_class(**ost):
+def record_source(ost, compact=False):
     '''
-    Make and return a type corresponding to record object schema type.
+    Return class source for record object schema type.
+
+    If compact, the record holds its fields in slots.
     '''
     ost.setdefault("doc", "")
     fields = ost['fields']
@@ -241,6 +612,8 @@ def record_class(**ost):
         field_arg_list.append(one)
     more['field_arg_list'] = ', '.join(field_arg_list)
     more.update(ost)
+    if compact:
+        return compact_record_source(more)
 
     # make class def + init via compile/exec in order to get rich meta
     # info / docstrings.
@@ -274,26 +647,111 @@ class {name}(_Record):
 
     @{name}.setter
     def {name}(self, value):
-        cls = get_type("{item}")
-        value = cls(value)
-        self._value["{name}"] = value
+        self._value["{name}"] = self._field_value("{name}", value)
 '''.format(**field)
         acc.append(one)
     source = '\n'.join([class_source] + acc)
     # print(source)
-    return classify(source, **ost)
+    return source
+
+
+def compact_record_source(more):
+    '''
+    Return class source for record in compact mode.
+    '''
+    fields = more['fields']
+    slots = ''.join(['"_v_{name}", '.format(**f) for f in fields])
+    class_source = '''
+class {name}(_CompactRecord):
+    """
+    Record type {name} with fields: {field_name_list}
+
+    {doc}
+    """
+    __slots__ = ({slots})
+
+    def __init__(self, *args, {field_arg_list}):
+        """
+        Create a record type of {name}
+        """
+        self.update({field_args_fwd})
+        self.update(*args)
+'''.format(slots=slots, **more)
+
+    acc = list()
+    for field in fields:
+        one = '''
+    @property
+    def {name}(self):
+        try:
+            val = self._v_{name}
+        except AttributeError:
+            raise AttributeError("no such attribute {name}") from None
+        if isinstance(val, BaseType):
+            return val.pod()
+        return val
+
+    @{name}.setter
+    def {name}(self, value):
+        self._store("{name}", self._field_value("{name}", value))
+'''.format(**field)
+        acc.append(one)
+    return '\n'.join([class_source] + acc)
+
+
+def record_class(compact=False, **ost):
+    '''
+    Make and return a type corresponding to record object schema type.
+    '''
+    return classify(record_source(ost, compact), **ost)
 
 
 class _Sequence(BaseType):
+    '''
+    The oschema sequence class.
+
+    A sequence of numbers is held in one numpy array of the item dtype
+    instead of as a list of number objects.
+    '''
+    __slots__ = ()
 
     def __repr__(self):
         return '<sequence %s %d:[%s]>' % \
             (self.__class__.__name__, len(self._value), self.ost['items'])
 
-    def pod(self):
-        'Return value as plain old data'
+    def pod(self, buffer=False):
+        '''
+        Return value as plain old data.
+
+        If buffer is True and items are numbers, return a read-only
+        numpy array of the values instead of a list.
+        '''
+        if isinstance(self._value, numpy.ndarray):
+            if buffer:
+                return self._value
+            if self._item_type()._kind == "f4":
+                return [float('%.6e'%one) for one in self._value.tolist()]
+            return self._value.tolist()
         return [one.pod() for one in self._value]
 
+    def validate(self):
+        if not isinstance(self._value, numpy.ndarray):
+            for one in self._value:
+                one.validate()
+        return self
+
+    def __setstate__(self, state):
+        '''
+        Restore from pickled state keeping an array of numbers read-only.
+        '''
+        if not isinstance(state, tuple): # (dict, slots) in compact mode
+            state = (state, None)
+        for part in state:
+            for key, val in (part or {}).items():
+                setattr(self, key, val)
+        if isinstance(self._value, numpy.ndarray):
+            self._value.flags.writeable = False
+
     def update(self, val):
         'Update self with new value'
         if isinstance(val, str):
@@ -312,16 +770,85 @@ class _Sequence(BaseType):
         raise ValueError("attempt to set sequence %s with garbage string" %
                          self.__class__.__name__)
 
+    # Set for each sequence class on first use.
+    _items_type = None
+    _items_dtype = False        # None if items are not held in an array
+
+    @classmethod
+    def _item_type(cls):
+        'Return the type of the sequence items'
+        if cls._items_type is None:
+            cls._items_type = get_type(cls._ost['items'])
+        return cls._items_type
+
+    @classmethod
+    def _array_dtype(cls):
+        'Return dtype of array holding items or None if items are not numbers'
+        if cls._items_dtype is False:
+            items = cls._item_type()
+            dtype = None
+            if issubclass(items, _Number):
+                dtype = numpy.dtype(items._ost["dtype"])
+                if dtype.kind not in "iuf":
+                    dtype = None
+            cls._items_dtype = dtype
+        return cls._items_dtype
+
     def _from_list(self, lst):
+        dtype = self._array_dtype()
+        if dtype is not None:
+            self._value = self._from_numbers(lst, dtype)
+            return
+        if isinstance(lst, numpy.ndarray):
+            lst = lst.tolist()
         if not lst:
             self._value = list()
             return
-        items = get_type(self.ost['items'])
+        items = self._item_type()
         self._value = [items(one) for one in lst]
 
-def sequence_class(**ost):
+    def _from_numbers(self, lst, dtype):
+        '''
+        Return read-only array of dtype holding valid numbers from lst.
+
+        An array of dtype is used without copying.
+        '''
+        items = self._item_type()
+        if isinstance(lst, numpy.ndarray):
+            if lst.dtype == dtype and lst.ndim == 1:
+                arr = lst.view()
+                if items._check is not None:
+                    check_numbers(items, arr)
+                arr.flags.writeable = False
+                return arr
+            lst = lst.tolist()
+
+        lst = list(lst)
+        types = set(map(type, lst))
+        arr = None
+        if not types:
+            arr = numpy.zeros(0, dtype)
+        elif items._kind == "int" and types == {int}:
+            lo, hi = items._bounds
+            if lo <= min(lst) and max(lst) <= hi:
+                arr = numpy.array(lst, dtype)
+        elif items._kind in ("f4", "f8") and types <= {int, float}:
+            if all(-_exact_int <= one <= _exact_int
+                   for one in lst if type(one) is int):
+                arr = numpy.array(lst, dtype)
+        if arr is None:
+            # one by one for the exact conversions and errors of items
+            arr = numpy.array([items(one)._value for one in lst], dtype)
+        elif items._check is not None:
+            check_numbers(items, arr)
+        arr.flags.writeable = False
+        return arr
+
+def sequence_source(ost, compact=False):
     '''
-    Make and return a type corresponding to sequence object schema type.
+    Return class source for sequence object schema type.
+
+    If compact, the type holds its value in a slot.
     '''
     ost.setdefault("doc", "")
     class_source = '''
@@ -330,6 +857,7 @@ class {name}(_Sequence):
     A {name} sequence holding type {items}.
     {doc}
     """
+    {slots}
 
     def __init__(self, val):
         """
@@ -337,14 +865,22 @@ class {name}(_Sequence):
         """
         self._value = list()
         self.update(val)
-'''.format(**ost)
-    return classify(class_source, **ost)
+'''.format(slots=_value_slots(compact), **ost)
+    return class_source
+
+
+def sequence_class(compact=False, **ost):
+    '''
+    Make and return a type corresponding to sequence object schema type.
+    '''
+    return classify(sequence_source(ost, compact), **ost)
 
 
 class _String(BaseType):
     '''
     String schema class
     '''
+    __slots__ = ()
 
     def __repr__(self):
         if self._value is None:
@@ -368,22 +904,52 @@ class _String(BaseType):
             return
         if not isinstance(val, str):
             raise ValueError(f'illegal type for string {cname}: {type(val)}')
-        ost = self.ost
-        schema = dict(type="string")
-        if ost["pattern"]:
-            schema["pattern"] = ost["pattern"]
-        if ost["format"]:
-            schema["format"] = ost["format"]
-        try:
-            validate(val, schema)
-        except ValidationError as verr:
+        verr = self._check(val)
+        if verr is not None:
             raise ValueError(f'format mismatch for string {cname}') from verr
         self._value = val
 
+    # Set for each string class by _setup().
+    _pattern = None             # compiled pattern
+    _conforms = None            # format check
+    _invalid = None             # error if the schema itself is invalid
+
+    @classmethod
+    def _setup(cls):
+        ost = cls._ost
+        cls._pattern = cls._conforms = cls._invalid = None
+        if ost.get("pattern", None):
+            try:
+                cls._pattern = re.compile(ost["pattern"])
+            except re.error as err:
+                cls._invalid = err
+        fmt = ost.get("format", None)
+        if fmt and format_checker is not None and fmt in format_checker.checkers:
+            def conforms(val):
+                return format_checker.conforms(val, fmt)
+            cls._conforms = staticmethod(conforms)
+
+    def _check(self, val):
+        '''
+        Return a ValidationError if val violates the pattern or format.
+
+        As with JSON Schema, the pattern may match anywhere in the
+        string and unknown formats are not checked.
+        '''
+        if self._invalid is not None:
+            return ValidationError('invalid')
+        if self._pattern is not None and not self._pattern.search(val):
+            return ValidationError(f'{val!r} does not match {self._pattern.pattern!r}')
+        if self._conforms is not None and not self._conforms(val):
+            return ValidationError(f'{val!r} is not a {self._ost["format"]!r}')
+        return None
+
 
-def string_class(**ost):
+def string_source(ost, compact=False):
     '''
-    Make and return a type corresponding to string object schema type.
+    Return class source for string object schema type.
+
+    If compact, the type holds its value in a slot.
     '''
     ost.setdefault("doc", "")
     ost.setdefault("format", None)
@@ -397,20 +963,29 @@ class {name}(_String):
 
     {doc}
     """
+    {slots}
 
     def __init__(self, val:str):
         """
         Create a string type {name}.
         """
         self.update(val)
-'''.format(**ost)
-    return classify(class_source, **ost)
+'''.format(slots=_value_slots(compact), **ost)
+    return class_source
+
+
+def string_class(compact=False, **ost):
+    '''
+    Make and return a type corresponding to string object schema type.
+    '''
+    return classify(string_source(ost, compact), **ost)
 
 
 class _Boolean(BaseType):
     '''
     The oschema boolean class
     '''
+    __slots__ = ()
 
     def __repr__(self):
         if self._value is None:
@@ -444,9 +1019,11 @@ class _Boolean(BaseType):
         raise ValueError(f'illegal {cname} boolean type: {type(val)}')
 
 
-def boolean_class(**ost):
+def boolean_source(ost, compact=False):
     '''
-    Make and return a type corresponding to boolean object schema type.
+    Return class source for boolean object schema type.
+
+    If compact, the type holds its value in a slot.
     '''
     ost.setdefault("doc", "")
     class_source = '''
@@ -455,22 +1032,155 @@ class {name}(_Boolean):
     A {name} boolean type.
     {doc}
     """
+    {slots}
 
     def __init__(self, val:bool):
         """
         Create a boolean type {name}.
         """
         self.update(val)
-'''.format(**ost)
-    return classify(class_source, **ost)
+'''.format(slots=_value_slots(compact), **ost)
+    return class_source
+
+
+def boolean_class(compact=False, **ost):
+    '''
+    Make and return a type corresponding to boolean object schema type.
+    '''
+    return classify(boolean_source(ost, compact), **ost)
+
+
+def number_checker(cname, constraints, eps):
+    '''
+    Return a function raising ValueError if a number violates
+    constraints or None if there are no constraints.
+    '''
+    if not constraints:
+        return None
+    checks = list()
+
+    mof = constraints.get("multipleOf", None)
+    if mof is not None:
+        def check(v):
+            if abs(v/mof - int(round(v/mof))) > eps:
+                raise ValueError(f'illegal {cname} number {v} not multiple of {mof}')
+        checks.append(check)
+
+    emaxi = constraints.get("exclusiveMaximum", None)
+    if emaxi is not None:
+        def check(v):
+            if not v < emaxi:
+                raise ValueError(f'illegal {cname} number {v} not strictly less than {emaxi}')
+        checks.append(check)
+
+    emini = constraints.get("exclusiveMinimum", None)
+    if emini is not None:
+        def check(v):
+            if not v > emini:
+                raise ValueError(f'illegal {cname} number {v} not strictly greater than {emini}')
+        checks.append(check)
+
+    maxi = constraints.get("maximum", None)
+    if maxi is not None:
+        def check(v):
+            if not v <= maxi:
+                raise ValueError(f'illegal {cname} number {v} not less than or equal {maxi}')
+        checks.append(check)
+
+    mini = constraints.get("minimum", None)
+    if mini is not None:
+        def check(v):
+            if not v >= mini:
+                raise ValueError(f'illegal {cname} number {v} not greater than or equal {mini}')
+        checks.append(check)
+
+    if not checks:
+        return None
+    if len(checks) == 1:
+        return checks[0]
+
+    def check_all(v):
+        for check in checks:
+            check(v)
+    return check_all
+
+
+def check_numbers(items, arr):
+    '''
+    Raise ValueError as the number type items would for the first
+    element of arr violating its constraints.
+    '''
+    for ind in number_suspects(items, arr):
+        items._check(arr[ind].item())
+
+
+def number_suspects(items, arr):
+    '''
+    Return indices of elements of arr which may violate constraints of
+    the number type items.
+
+    The constraints are evaluated on all elements at once with the
+    elements as float64 as Python compares them.  Elements found
+    should be checked again one by one to give the exact error.
+    '''
+    if arr.dtype.kind in "iu" and len(arr) and \
+       max(abs(int(arr.min())), abs(int(arr.max()))) > _exact_int:
+        bad = numpy.ones(len(arr), bool) # not exact as float64
+    else:
+        nc = items._ost.get("constraints", None) or {}
+        vals = arr.astype('f8')
+        bad = numpy.zeros(len(arr), bool)
+        mof = nc.get("multipleOf", None)
+        if mof is not None:
+            ratio = vals / mof
+            bad |= numpy.abs(ratio - numpy.round(ratio)) > items._eps
+        for key, ok in (("exclusiveMaximum", numpy.less),
+                        ("exclusiveMinimum", numpy.greater),
+                        ("maximum", numpy.less_equal),
+                        ("minimum", numpy.greater_equal)):
+            lim = nc.get(key, None)
+            if lim is not None:
+                bad |= ~ok(vals, lim)
+    return numpy.flatnonzero(bad)
+
+
+# Python ints of at most this magnitude convert exactly to float.
+_exact_int = 2**53
 
 
 class _Number(BaseType):
     '''
     The oschema number class
+
+    The value is held as a native int or float.  Common dtypes are
+    converted without numpy giving the same result as numpy would.
     '''
+    __slots__ = ()
     _eps = 1e-6
 
+    # Set for each number class by _setup().
+    _dtype = None
+    _kind = None                # "int", "f4" or "f8" or None to use numpy
+    _bounds = None              # (min, max) of integer dtype
+    _check = None               # constraint checker
+
+    @classmethod
+    def _setup(cls):
+        dtype = numpy.dtype(cls._ost["dtype"])
+        cls._dtype = dtype
+        cls._kind = None
+        if dtype.kind in "iu":
+            info = numpy.iinfo(dtype)
+            cls._kind = "int"
+            cls._bounds = (int(info.min), int(info.max))
+        elif dtype == numpy.dtype('f4'):
+            cls._kind = "f4"
+        elif dtype == numpy.dtype('f8'):
+            cls._kind = "f8"
+        check = number_checker(cls.__name__,
+                               cls._ost.get("constraints", None), cls._eps)
+        cls._check = None if check is None else staticmethod(check)
+
     def __repr__(self):
         if self._value is None:
             return '<number %s: None>' % self.__class__.__name__
@@ -479,61 +1189,62 @@ class _Number(BaseType):
     def pod(self):
         if self._value is None:
             raise ValueError("number %s is unset" % self.__class__.__name__)
-        val = self._value.item()
 
         # this is pretty sketchy but it's to satisfy issue #11.
-        if self._value.dtype == numpy.dtype('f4'):
-            return float('%.6e'%val)
-        return val
+        if self._kind == "f4":
+            return float('%.6e'%self._value)
+        return self._value
 
-    def update(self, val):
-        dtype = self.ost["dtype"]
-        dtype = numpy.dtype(dtype)
+    @classmethod
+    def _native(cls, val):
+        '''
+        Return val as an int or float as numpy would for the dtype.
+        '''
+        kind = cls._kind
+        typ = type(val)
+        if kind == "int":
+            if typ is float and math.isfinite(val):
+                val = int(val)  # truncates, as numpy
+                typ = int
+            if typ is int:
+                lo, hi = cls._bounds
+                if lo <= val <= hi:
+                    return val
+        elif kind == "f8":
+            if typ is float:
+                return val
+            if typ is int and -_exact_int <= val <= _exact_int:
+                return float(val)
+        elif kind == "f4":
+            if typ is float or (typ is int and -_exact_int <= val <= _exact_int):
+                try:
+                    return _unpack_f4(_pack_f4(val))[0]
+                except OverflowError:
+                    pass        # numpy gives inf
+        # odd dtypes, strings, out of range values and their errors
+        return numpy.array(val, cls._dtype).item()
 
+    def update(self, val):
         cname = self.__class__.__name__
 
         if type(val) in (int, float, str):
-            value = numpy.array(val, dtype)
+            pass
         elif isinstance(val, self.__class__):
-            value = numpy.array(val.pod(), dtype)
+            val = val.pod()
         else:
             raise ValueError(f'illegal {cname} number type: {type(val)}')
 
-        nc = self.ost.get("constraints", None)
-        if nc:                  # run the gauntlet
-            v = value.item()
-
-            mof = nc.get("multipleOf", None)
-            if mof is not None:
-                if abs(v/mof - int(round(v/mof))) > self._eps:
-                    raise ValueError(f'illegal {cname} number {v} not multiple of {mof}')
-
-            emaxi = nc.get("exclusiveMaximum", None)
-            if emaxi is not None:
-                if not v < emaxi:
-                   raise ValueError(f'illegal {cname} number {v} not strictly less than {emaxi}')
-
-            emini = nc.get("exclusiveMinimum", None)
-            if emini is not None:
-                if not v > emini:
-                   raise ValueError(f'illegal {cname} number {v} not strictly greater than {emini}')
-
-            maxi = nc.get("maximum", None)
-            if maxi is not None:
-                if not v <= maxi:
-                   raise ValueError(f'illegal {cname} number {v} not less than or equal {maxi}')
-
-            mini = nc.get("minimum", None)
-            if mini is not None:
-                if not v >= mini:
-                   raise ValueError(f'illegal {cname} number {v} not greater than or equal {mini}')
-
+        value = self._native(val)
+        if self._check is not None: # run the gauntlet
+            self._check(value)
         self._value = value
 
 
-def number_class(**ost):
+def number_source(ost, compact=False):
     '''
-    Make and return a type corresponding to number object schema type.
+    Return class source for number object schema type.
+
+    If compact, the type holds its value in a slot.
     '''
     dtype = ost["dtype"]
     dtype = numpy.dtype(dtype)
@@ -545,20 +1256,29 @@ class {name}(_Number):
     A number type {name} dtype {dtype}
     {doc}
     """
+    {slots}
 
     def __init__(self, val):
         """
         Create a number type {name} dtype {dtype}.
         """
         self.update(val)
-'''.format(**ost)
-    return classify(class_source, **ost)
+'''.format(slots=_value_slots(compact), **ost)
+    return class_source
+
+
+def number_class(compact=False, **ost):
+    '''
+    Make and return a type corresponding to number object schema type.
+    '''
+    return classify(number_source(ost, compact), **ost)
 
 
 class _Enum(BaseType):
     '''
     The oschema enum class
     '''
+    __slots__ = ()
 
     def __repr__(self):
         if self._value is None:
@@ -586,9 +1306,15 @@ class _Enum(BaseType):
         raise ValueError(f'illegal enum {cname} value {val}')
 
 
-def enum_class(**ost):
+# Types whose values compact records hold as plain old data.
+_scalar_types = (_Boolean, _Number, _String, _Enum)
+
+
+def enum_source(ost, compact=False):
     '''
-    Make and return a type corresponding to enum object schema type.
+    Return class source for enum object schema type.
+
+    If compact, the type holds its value in a slot.
     '''
     ost.setdefault("doc", "")
     class_source = '''
@@ -597,21 +1323,30 @@ class {name}(_Enum):
     An enum type {name} in {symbols}
     {doc}
     """
-    _value = "{default}"
+    {slots}
 
     def __init__(self, val: str = None):
         """
         Create a enum type {name}.
         """
         self.update(val)
-'''.format(**ost)
-    return classify(class_source, **ost)
+'''.format(slots=_value_slots(compact) or '_value = "{default}"'.format(**ost),
+           **ost)
+    return class_source
+
+
+def enum_class(compact=False, **ost):
+    '''
+    Make and return a type corresponding to enum object schema type.
+    '''
+    return classify(enum_source(ost, compact), **ost)
 
 
 class _Any(BaseType):
     '''
     The oschema any class
     '''
+    __slots__ = ()
 
     def __repr__(self):
         cname = self.ost['name']
@@ -624,6 +1359,11 @@ class _Any(BaseType):
             raise ValueError("any type is unset")
         return self._value.pod()
 
+    def validate(self):
+        if self._value is not None:
+            self._value.validate()
+        return self
+
     def update(self, val):
         if isinstance(val, self.__class__):
             self._value = val._value
@@ -638,9 +1378,11 @@ class _Any(BaseType):
         raise ValueError(f'any type {cname} requires oschema type, got {typ}')
 
 
-def any_class(**ost):
+def any_source(ost, compact=False):
     '''
-    Make and return a type corresponding to any object schema type.
+    Return class source for any object schema type.
+
+    If compact, the type holds its value in a slot.
     '''
     ost.setdefault("doc", "")
     class_source = '''
@@ -649,25 +1391,290 @@ class {name}(_Any):
     An any type {name}.
     {doc}
     """
+    {slots}
 
     def __init__(self, val):
         """
         Create a any type {name}.
         """
         self.update(val)
-'''.format(**ost)
-    return classify(class_source, **ost)
+'''.format(slots=_value_slots(compact), **ost)
+    return class_source
+
+
+def any_class(compact=False, **ost):
+    '''
+    Make and return a type corresponding to any object schema type.
+    '''
+    return classify(any_source(ost, compact), **ost)
+
+
+def _column(ItemType, values):
+    '''
+    Return (objects, errors) making ItemType instances from values.
+
+    Objects are None where the value is invalid and errors are
+    (position, exception) pairs.
+    '''
+    objs = [None] * len(values)
+    errors = list()
+
+    if issubclass(ItemType, _Number):
+        natives = list()
+        for pos, val in enumerate(values):
+            try:
+                if type(val) not in (int, float, str):
+                    val = ItemType(val)._value
+                else:
+                    val = ItemType._native(val)
+            except (ValueError, TypeError, OverflowError) as err:
+                errors.append((pos, err))
+                val = None
+            natives.append(val)
+        if ItemType._check is not None:
+            good = [pos for pos, val in enumerate(natives) if val is not None]
+            arr = numpy.array([natives[pos] for pos in good], ItemType._dtype)
+            for ind in number_suspects(ItemType, arr):
+                pos = good[ind]
+                try:
+                    ItemType._check(natives[pos])
+                except ValueError as err:
+                    errors.append((pos, err))
+                    natives[pos] = None
+        for pos, val in enumerate(natives):
+            if val is not None:
+                obj = ItemType.__new__(ItemType)
+                obj._value = val
+                objs[pos] = obj
+        return objs, errors
+
+    # validate each distinct scalar value once
+    seen = dict() if issubclass(ItemType, (_String, _Boolean, _Enum)) else None
+    for pos, val in enumerate(values):
+        if seen is not None and type(val) in (str, bool, int):
+            key = (type(val), val)
+            try:
+                objs[pos] = seen[key]
+                continue
+            except KeyError:
+                pass
+        try:
+            obj = ItemType(val)
+        except (ValueError, TypeError, OverflowError, AttributeError) as err:
+            errors.append((pos, err))
+            continue
+        if seen is not None and type(val) in (str, bool, int):
+            seen[key] = obj
+        objs[pos] = obj
+    return objs, errors
+
+
+def make_many(TypeClass, iterable):
+    '''
+    Return list of instances of TypeClass made from an iterable.
+
+    For a record type, items which are dictionaries are checked field
+    by field across all items, resolving each field type once and
+    validating each distinct string, boolean or enum value once.
+    Other items and other types are made one by one.
+
+    If any item is invalid, a ValueError is raised which reports all
+    invalid items by their index.
+    '''
+    rows = list(iterable)
+    cname = TypeClass.__name__
+    errors = list()
+    ret = [None] * len(rows)
+
+    if not issubclass(TypeClass, _Record):
+        objs, errors = _column(TypeClass, rows)
+        ret = objs
+    else:
+        fields = TypeClass._fields
+        bulk = list()
+        for ind, row in enumerate(rows):
+            if type(row) is dict:
+                obj = TypeClass.__new__(TypeClass)
+                if not isinstance(obj, _CompactRecord):
+                    obj._value = dict()
+                ret[ind] = obj
+                bulk.append(ind)
+                continue
+            try:
+                ret[ind] = TypeClass(row)
+            except (ValueError, TypeError, OverflowError, AttributeError) as err:
+                errors.append((ind, err))
+
+        for fname, field in fields.items():
+            ItemType = TypeClass._item_type(fname)
+            where = list()
+            values = list()
+            for ind in bulk:
+                # absent as None takes the default, as in __init__()
+                fval = rows[ind].get(fname, None)
+                if fval is None:
+                    fval = field.get("default", None)
+                if fval is None:
+                    continue
+                if isinstance(fval, BaseType) and \
+                   not isinstance(fval, ItemType) and \
+                   not issubclass(ItemType, _Any):
+                    tname = type(fval)
+                    errors.append((ind, ValueError(f'{cname}.{fname}: got {tname}, want {ItemType}')))
+                    continue
+                where.append(ind)
+                values.append(fval)
+            objs, errs = _column(ItemType, values)
+            for pos, err in errs:
+                errors.append((where[pos], ValueError(f'{cname}.{fname}: {err}')))
+            if issubclass(TypeClass, _CompactRecord):
+                slot = "_v_" + fname
+                scalar = issubclass(ItemType, _scalar_types)
+                for ind, obj in zip(where, objs):
+                    if obj is not None:
+                        setattr(ret[ind], slot, obj.pod() if scalar else obj)
+            else:
+                for ind, obj in zip(where, objs):
+                    if obj is not None:
+                        ret[ind]._value[fname] = obj
+
+    if errors:
+        errors.sort(key=lambda e: e[0])
+        inds = sorted(set([e[0] for e in errors]))
+        lines = [f'{len(inds)} of {len(rows)} {cname} items invalid at indices {inds}']
+        lines += [f'[{ind}] {err}' for ind, err in errors]
+        raise ValueError('\n'.join(lines))
+    return ret
+
 
+def from_records(SequenceClass, iterable):
+    '''
+    Return instance of a sequence type made from an iterable of items.
 
-def make_type(**ost):
+    The items are made with make_many() and errors are reported in the
+    same way.
+    '''
+    if SequenceClass._array_dtype() is not None:
+        return SequenceClass(list(iterable))
+    items = make_many(SequenceClass._item_type(), iterable)
+    seq = SequenceClass.__new__(SequenceClass)
+    seq._value = items
+    return seq
+
+
+def make_type(compact=False, **ost):
     '''
     Make a Python type from the oschema.
+
+    If compact, instances of the type hold their values in slots and
+    records hold scalar fields as plain old data.  This uses much less
+    memory for many instances.
     '''
     meth = globals()[ost['schema'] + '_class']
-    return meth(**ost)
+    return meth(compact, **ost)
 
 
-def make_types(schema):
+def type_source(ost, compact=False):
+    '''
+    Return source making and placing the Python type for the oschema.
+
+    The ost may be updated with defaults.
+    '''
+    meth = globals()[ost['schema'] + '_source']
+    source = meth(ost, compact)
+    return '\n'.join([deps_code(**ost), source,
+                      f'_classified({ost["name"]}, {ost!r})', ''])
+
+
+def module_source(schema, compact=False):
+    '''
+    Return source of a module making the Python types for a schema.
+
+    The module is meant to be executed in the namespace of moo.otypes.
+    '''
+    parts = ["# Generated by moo.otypes.module_source(), do not edit."]
+    for one in schema:
+        parts.append(type_source(dict(one), compact))
+    return '\n'.join(parts)
+
+
+def type_name(ost):
+    '''
+    Return fully qualified name of the type for the oschema.
+    '''
+    path = ost.get("path", None) or []
+    if isinstance(path, str):
+        path = path.split(".")
+    return '.'.join(list(path) + [ost["name"]])
+
+
+class ModuleCache(moo.cache.DiskCache):
+    '''
+    Disk cache of generated modules.
+
+    The byte code Python caches for an entry counts toward its size
+    and is removed with it.
+    '''
+
+    def __init__(self, name="otypes"):
+        super().__init__(name, suffix=".py")
+
+    def entries(self):
+        ret = list()
+        for atime, size, fname in super().entries():
+            try:
+                size += os.stat(cache_from_source(fname)).st_size
+            except OSError:
+                pass
+            ret.append((atime, size, fname))
+        return ret
+
+    def remove(self, fname):
+        if not super().remove(fname):
+            return False
+        try:
+            os.remove(cache_from_source(fname))
+        except OSError:
+            pass
+        return True
+
+
+def cached_types(schema, compact=False):
+    '''
+    Make Python types from a schema via a module cached on disk.
+
+    The module generated for a schema is stored under the moo cache
+    directory keyed by a digest of the schema and of this code.  A
+    later call with an equal schema, eg in another process, runs the
+    stored module and its byte code cached by Python instead of
+    generating and compiling source.
+
+    Return None if the schema can not be cached.
+    '''
+    import moo
+    from importlib.machinery import SourceFileLoader
+
+    try:
+        key = moo.cache.digest(moo.__version__,
+                               moo.cache.file_digest(__file__), compact, schema)
+    except TypeError:           # not JSON serializable
+        return None
+    key = "otypes_" + key
+    cache = ModuleCache()
+    if cache.read(key) is None:
+        if not cache.write(key, module_source(schema, compact).encode()):
+            return None
+    fname = cache.filename(key)
+    code = SourceFileLoader(key, fname).get_code(key)
+    exec(code, globals())
+    ret = dict()
+    for one in schema:
+        typ = get_type(type_name(one))
+        ret[typ.__module__ + '.' + typ.__name__] = typ
+    return ret
+
+
+def make_types(schema, cache=None, compact=False, lazy=False):
     '''Make Python types from a schema structure.
 
     The schema should be in the form of an array of oschema type
@@ -681,22 +1688,47 @@ def make_types(schema):
     >>> from my.schema.path import MyType
     >>> myobj = MyType()
 
+    If cache is True the types are made via a module cached on disk.
+    See cached_types().  By default this is off unless the application
+    sets both moo.cache.enabled and moo.cache.modules, as the CLI does.
+
+    See make_type() for compact.
+
+    If lazy, the types are only registered and each is made when first
+    got from its module, eg by import, by get_type() or from the
+    returned mapping.  A schema of many types of which few are used is
+    then quick to load.  Lazily made types do not use the cache.
     '''
+    if lazy:
+        names = dict()
+        for one in schema:
+            fqn = register_type(copy.deepcopy(one), compact)
+            names[fqn if one.get("path", None) else f'{__name__}.{fqn}'] = fqn
+        return LazyTypes(names)
+
+    if cache is None:
+        cache = moo.cache.enabled and moo.cache.modules
+    if cache:
+        ret = cached_types(schema, compact)
+        if ret is not None:
+            return ret
+
     ret = dict()
     for one in schema:
-        typ = make_type(**one)
+        typ = make_type(compact, **one)
         ret[typ.__module__ + '.' + typ.__name__] = typ
     return ret
 
 
-def load_types(filename, path=()):
+def load_types(filename, path=(), cache=None, compact=False, lazy=False):
     '''Load Python types from an oschema file.
 
     The named file may be provided in any format supported by moo.
 
-    See make_types() for more info on resulting types.
+    See make_types() for more info on resulting types, cache, compact
+    and lazy.
 
     See moo.io.load() for use of "paths".
     '''
     types = load_file(filename, list(path))
-    return make_types(types)
+    return make_types(types, cache, compact, lazy)
@@ -3,11 +3,14 @@
 Methods to validate models against schema.
 '''
 
-import moo.jsonschema 
+import os
+import moo.cache
+import moo.ocheck
+import moo.jsonschema
 
 from moo.jsonschema import ValidationError
 
-def validate(models, targets, context=None, throw=True, validator="jsonschema"):
+def validate(models, targets, context=None, throw=True, validator="jsonschema", jobs=None):
     '''
     Validate models against schema.
 
@@ -19,30 +22,148 @@ def validate(models, targets, context=None, throw=True, validator="jsonschema"):
 
     If "throw" is True, a ValueError is raised on first failure and only return True (or sequence or True) may be returned.
 
-    The validator string names the validation engine to use in ("jsonschema", "fastjsonschema").
+    The validator string names the validation engine to use in ("jsonschema", "fastjsonschema", "native").  The "native" engine checks models directly against oschema, see moo.ocheck.
+
+    See validate_many() for the meaning of jobs.
     '''
-    sequence = True
     if not isinstance(targets, (list,tuple)):
-        sequence = False
-        models = [models]
-        targets = [targets]
+        return validate_many([models], [targets], context, throw, validator)[0]
+    return validate_many(models, targets, context, throw, validator, jobs)
+
+
+def group_targets(targets):
+    '''
+    Return list of (target, indices) grouping equal targets.
+    '''
+    groups = dict()
+    keys = dict()               # avoid digesting one object many times
+    for ind, target in enumerate(targets):
+        key = keys.get(id(target))
+        if key is None:
+            try:
+                key = moo.cache.digest(target)
+            except TypeError:   # not JSON serializable
+                key = id(target)
+            keys[id(target)] = key
+        groups.setdefault(key, (target, list()))[1].append(ind)
+    return list(groups.values())
 
+
+def compile_check(schema, validator, context=None):
+    '''
+    Return function checking a model against schema with validator.
+
+    The schema is JSON Schema or, for the "native" validator, an
+    oschema type in the context.
+    '''
+    if validator == "native":
+        return moo.ocheck.compile_check(schema, context)
+    return moo.jsonschema.compile_validator(schema, validator)
+
+
+def validate_chunk(schema, validator, models, context=None):
+    '''
+    Return list of Booleans indicating validity of models against schema.
+    '''
+    check = compile_check(schema, validator, context)
     res = list()
-    for model, target in zip(models, targets):
+    for model in models:
+        try:
+            check(model)
+        except ValidationError:
+            res.append(False)
+        else:
+            res.append(True)
+    return res
+
+
+def validate_many(models, targets, context=None, throw=True, validator="jsonschema", jobs=None):
+    '''
+    Validate a sequence of models against a matched sequence of targets.
+
+    Models sharing an equal target are grouped so that each distinct
+    target is converted to JSON Schema and compiled once, or, for the
+    "native" validator, compiled directly.  Return list of Booleans in
+    the order of the models.
+
+    If "throw" is True, the failure of the first invalid model in
+    order is raised.
+
+    If jobs is given, validation is spread over that many worker
+    processes (0 means one per CPU).  This pays off only for many or
+    large models.
+    '''
+    models = list(models)
+    targets = list(targets)
+    if len(models) != len(targets):
+        raise ValueError(f'sequence size mismatch: #models:{len(models)}, #targets:{len(targets)}')
+
+    native = validator == "native"
+    if native:
+        compile = moo.ocheck.Compiler(context)
+        groups = group_targets(targets)
+    else:
+        convert = moo.jsonschema.Converter(context)
+        groups = [(convert(target), inds)
+                  for target, inds in group_targets(targets)]
+        compile = lambda js: compile_check(js, validator)
 
-        js = moo.jsonschema.convert(target, context)
+    if not isinstance(validator, str):
+        checks = [None] * len(models)
+        for js, inds in groups:
+            def check(model, js=js):
+                return validator(model, js)
+            for ind in inds:
+                checks[ind] = check
+        return validate_checks(models, checks, throw)
 
+    if jobs is None:
+        checks = [None] * len(models)
+        for js, inds in groups:
+            check = compile(js)
+            for ind in inds:
+                checks[ind] = check
+        return validate_checks(models, checks, throw)
+
+    res = [None] * len(models)
+    nworkers = jobs or os.cpu_count() or 1
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=nworkers) as pool:
+        futures = list()
+        for js, inds in groups:
+            size = max(1, len(inds) // (4 * nworkers))
+            for beg in range(0, len(inds), size):
+                chunk = inds[beg:beg+size]
+                fut = pool.submit(validate_chunk, js, validator,
+                                  [models[ind] for ind in chunk],
+                                  context if native else None)
+                futures.append((chunk, fut))
+        for chunk, fut in futures:
+            for ind, ok in zip(chunk, fut.result()):
+                res[ind] = ok
+
+    if throw and not all(res):
+        ind = res.index(False)
+        js = [js for js, inds in groups if ind in inds][0]
+        # raise the error from this process
+        compile(js)(models[ind])
+    return res
+
+
+def validate_checks(models, checks, throw):
+    '''
+    Return validity of each model by its check function.
+    '''
+    res = list()
+    for model, check in zip(models, checks):
         if throw:
-            moo.jsonschema.validate(model, js, validator)
+            check(model)
             res.append(True)
             continue
         try:
-            moo.jsonschema.validate(model, js, validator)
+            check(model)
         except ValidationError:
             res.append(False)
         else:
             res.append(True)
-
-    if sequence:
-        return res
-    return res[0]
+    return res
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+'''
+A long-lived moo server and a client to forward commands to it.
+
+The server listens on a Unix socket and runs moo CLI commands on
+behalf of clients.  Many commands, eg as run from a build system, then
+share one process with warm Jsonnet, schema and template caches.
+
+A request is one JSON object with attributes:
+
+- argv :: the moo command line arguments (excluding "moo")
+- cwd :: the directory in which to run the command
+- env :: the MOO_* environment variables of the client
+
+Eg, {"argv": ["-M", "schema", "compile", "model.jsonnet"], ...}.
+
+A response is one JSON object with attributes:
+
+- status :: the exit status of the command
+- stdout :: base64 encoded standard output
+- stderr :: standard error text
+
+A request {"stop": true} stops the server.
+
+A client which can not connect to a server may run the command
+itself.  Once a request is sent, the server will run it and so the
+client waits for the response, by default until the command is done,
+or else at most the seconds given by the MOO_SERVE_TIMEOUT environment
+variable or the "timeout" attribute of this module.
+'''
+import os
+import io
+import sys
+import json
+import base64
+import socket
+import tempfile
+import traceback
+import socketserver
+from importlib import import_module
+
+# Application may set these.  Seconds a client waits to connect and,
+# once connected, for a response (None waits until the command is done).
+connect_timeout = 5
+timeout = None
+
+
+def default_socket():
+    '''
+    Return default socket path for the current user.
+    '''
+    return os.path.join(tempfile.gettempdir(), f'moo-{os.getuid()}.sock')
+
+
+def recv_all(sock):
+    'Read from socket until end of stream'
+    chunks = list()
+    while True:
+        chunk = sock.recv(2**16)
+        if not chunk:
+            break
+        chunks.append(chunk)
+    return b''.join(chunks)
+
+
+def client_timeout():
+    '''
+    Return seconds a client waits for a response or None to wait
+    until the command is done.
+    '''
+    try:
+        return float(os.environ["MOO_SERVE_TIMEOUT"])
+    except (KeyError, ValueError):
+        return timeout
+
+
+def command_name(group, argv):
+    '''
+    Return the subcommand named in command line argv of a click group.
+
+    This is the first argument which is neither an option of the group
+    nor the value of one.  None is returned if there is none.
+    '''
+    import click
+    takes_value = set()
+    for param in group.params:
+        if isinstance(param, click.Option) and not (param.is_flag or param.count):
+            takes_value.update(param.opts)
+    args = iter(argv)
+    for arg in args:
+        if arg == "--":
+            return next(args, None)
+        if arg == "-" or not arg.startswith("-"):
+            return arg
+        if arg in takes_value:
+            next(args, None)
+    return None
+
+
+def request(sockpath, req, timeout=None):
+    '''
+    Send a request to a server and return its response.
+
+    The response is waited on for timeout seconds or, if None, until it
+    comes.  Raises OSError if no server accepts a connection at
+    sockpath.  Once connected, the server may act on the request and
+    RuntimeError is raised if no valid response comes.
+    '''
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(connect_timeout)
+        sock.connect(sockpath)
+        sock.settimeout(timeout)
+        try:
+            sock.sendall(json.dumps(req).encode())
+            sock.shutdown(socket.SHUT_WR)
+            return json.loads(recv_all(sock).decode())
+        except (OSError, ValueError) as err:
+            raise RuntimeError(f'no response from server at {sockpath}: {err}') from err
+
+
+def forward(sockpath, argv):
+    '''
+    Run a moo command line via the server and emit its output.
+
+    Return the command exit status.  Raises OSError if no server
+    accepts the command, which may then be run otherwise, and
+    RuntimeError if the server took it but gave no response in time.
+    '''
+    env = {k: v for k, v in os.environ.items() if k.startswith("MOO_")}
+    res = request(sockpath, dict(argv=list(argv), cwd=os.getcwd(), env=env),
+                  client_timeout())
+    sys.stdout.buffer.write(base64.b64decode(res["stdout"]))
+    sys.stdout.flush()
+    sys.stderr.write(res["stderr"])
+    sys.stderr.flush()
+    return res["status"]
+
+
+# Module settings a command line may change, as (module, attribute).
+# These are restored after each request.
+settings = (("moo.cache", "enabled"), ("moo.cache", "modules"),
+            ("moo.cache", "directory"))
+
+
+class environment(object):
+    '''
+    Context to temporarily replace cwd, MOO_* env and stdio and to
+    restore module settings.
+    '''
+
+    def __init__(self, cwd, env):
+        self.cwd = cwd
+        self.env = env
+        self.stdout = io.TextIOWrapper(io.BytesIO(), encoding="utf-8",
+                                       write_through=True)
+        self.stderr = io.StringIO()
+
+    def __enter__(self):
+        self.saved = (os.getcwd(), sys.stdout, sys.stderr,
+                      {k: v for k, v in os.environ.items()
+                       if k.startswith("MOO_")})
+        self.saved_settings = [(mod, attr, getattr(mod, attr)) for mod, attr
+                               in [(import_module(m), a) for m, a in settings]]
+        for key in self.saved[3]:
+            del os.environ[key]
+        os.environ.update(self.env)
+        os.chdir(self.cwd)
+        sys.stdout = self.stdout
+        sys.stderr = self.stderr
+        return self
+
+    def __exit__(self, *exc):
+        cwd, sys.stdout, sys.stderr, env = self.saved
+        for key in [k for k in os.environ if k.startswith("MOO_")]:
+            del os.environ[key]
+        os.environ.update(env)
+        os.chdir(cwd)
+        for mod, attr, val in self.saved_settings:
+            setattr(mod, attr, val)
+
+    def output(self):
+        'Return captured (stdout bytes, stderr text)'
+        self.stdout.flush()
+        return self.stdout.buffer.getvalue(), self.stderr.getvalue()
+
+
+def run(argv, cwd, env):
+    '''
+    Run a moo command line in this process.
+
+    Return tuple (status, stdout bytes, stderr text).
+    '''
+    import click
+    from moo.__main__ import cli
+
+    status = 0
+    with environment(cwd, env) as ctx:
+        try:
+            if command_name(cli, argv) == "serve":
+                raise click.UsageError("the serve command can not be served")
+            cli.main(args=list(argv), prog_name="moo",
+                     standalone_mode=False, obj=None)
+        except click.exceptions.Exit as err:
+            status = err.exit_code
+        except click.ClickException as err:
+            err.show()
+            status = err.exit_code
+        except click.exceptions.Abort:
+            sys.stderr.write("Aborted!\n")
+            status = 1
+        except SystemExit as err:
+            status = err.code if isinstance(err.code, int) else 1
+        except Exception:
+            traceback.print_exc()
+            status = 1
+        out, errtext = ctx.output()
+    return status, out, errtext
+
+
+class Handler(socketserver.BaseRequestHandler):
+    'Handle one request'
+
+    def handle(self):
+        try:
+            req = json.loads(recv_all(self.request).decode())
+        except ValueError as err:
+            res = dict(status=2, stdout="", stderr=f'moo serve: bad request: {err}\n')
+        else:
+            if req.get("stop"):
+                self.server.stopping = True
+                res = dict(status=0, stdout="", stderr="")
+            else:
+                status, out, errtext = run(req["argv"], req["cwd"],
+                                           req.get("env", {}))
+                res = dict(status=status, stderr=errtext,
+                           stdout=base64.b64encode(out).decode())
+        self.request.sendall(json.dumps(res).encode())
+
+
+class Server(socketserver.UnixStreamServer):
+    '''
+    Serve requests one at a time on a Unix socket.
+    '''
+
+    # many build processes may wait on a busy server
+    request_queue_size = 256
+
+    # set by a stop request
+    stopping = False
+
+
+def warm():
+    '''
+    Import the modules and set the options for a long lived process.
+    '''
+    import moo
+    import moo.util
+    import moo.otypes
+    import moo.ovalid
+    import moo.templates
+    try:
+        import moo.xls
+    except ImportError:
+        pass
+    # files may come and go while a server lives
+    moo.util.resolve_check_mtime = True
+
+
+def serve(sockpath=None):
+    '''
+    Serve on the Unix socket at sockpath until stopped.
+    '''
+    sockpath = sockpath or default_socket()
+    if os.path.exists(sockpath):
+        try:
+            request(sockpath, dict(argv=["version"], cwd="/", env={}), 1)
+        except OSError:
+            os.remove(sockpath) # stale
+        except RuntimeError:
+            raise RuntimeError(f'a server is already running at {sockpath}')
+        else:
+            raise RuntimeError(f'a server is already running at {sockpath}')
+    warm()
+    server = Server(sockpath, Handler)
+    os.chmod(sockpath, 0o600)
+    try:
+        while not server.stopping:
+            server.handle_request()
+    finally:
+        server.server_close()
+        if os.path.exists(sockpath):
+            os.remove(sockpath)
@@ -1 +1 @@
-from .jinjaint import render, imports
+from .jinjaint import render, imports, candidates
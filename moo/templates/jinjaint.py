@@ -51,29 +51,81 @@ def make_env(path, **kwds):
 #             path.append(bi)
 #     return path
 
+# Environments used for rendering, keyed by search path and style.
+# Jinja caches compiled templates in an environment and reloads them
+# if their files change.
+render_envs = dict()
+
+
+def render_env(path, **kwds):
+    'Return a shared Jinja environment for rendering'
+    key = (tuple(path), tuple(sorted(kwds.items())))
+    env = render_envs.get(key)
+    if env is None:
+        env = render_envs[key] = make_env(path, **kwds)
+    return env
+
+
 def render(template, model, tpath=None):
     'Render template against dictionary of model parameters'
     path = search_path(template, tpath)
     style_params = get_style(template)
-    env = make_env(path, **style_params)
+    env = render_env(path, **style_params)
     tmpl = env.get_template(os.path.basename(template))
     return tmpl.render(**model)
 
 
 from moo.util import resolve
-def imports(template, tpath=None):
-    'Return all files imported by template'
+def imports(template, tpath=None, recursive=False):
+    '''Return all files imported by template
+
+    If recursive is True, include files imported by imported files.
+    '''
     #print(f'jinja imports for {template} with {tpath}')
     path = search_path(template, tpath)
     style_params = get_style(template)
     env = make_env(path, **style_params)
-    ast = env.parse(open(template, 'rb').read().decode())
-    subs = meta.find_referenced_templates(ast)
     # Note: this probably violates Jinja API as the env does not
     # expose the loader and certainly not its type.  But, we make the
     # loader so let's use it to make sure it knows how to find imports
     # correctly.  If this breaks, then we instead may pass tpath to
     # moo's resolve().
-    return [env.loader.get_source(env, s)[1] for s in subs]
+    ret = list()
+    todo = [open(template, 'rb').read().decode()]
+    while todo:
+        ast = env.parse(todo.pop(0))
+        for sub in meta.find_referenced_templates(ast):
+            if sub is None:     # dynamic name, can not know
+                continue
+            source, filename, _ = env.loader.get_source(env, sub)
+            if filename in ret:
+                continue
+            ret.append(filename)
+            if recursive:
+                todo.append(source)
+    return ret
+
+
+def candidates(template, tpath=None):
+    '''Return all files a render of template may load, in search order.
+
+    For the template and every template it imports, recursively, this
+    gives the file at that name in each directory of the search path,
+    whether or not it exists.  A file newly shadowing one that is used
+    thus appears in the list.
+    '''
+    path = search_path(template, tpath)
+    style_params = get_style(template)
+    env = make_env(path, **style_params)
+    names = [os.path.basename(template)]
+    todo = list(names)
+    while todo:
+        source, _, _ = env.loader.get_source(env, todo.pop(0))
+        for sub in meta.find_referenced_templates(env.parse(source)):
+            if sub is None or sub in names:
+                continue
+            names.append(sub)
+            todo.append(sub)
+    return [os.path.join(one, name) for name in names for one in path]
     # ret = [resolve(one) for one in subs]
     # return ret
@@ -201,6 +201,36 @@ def existing_paths(paths, warn=False):
     return ret
 
 
+# Memoized results of clean_paths(), search_path() and resolve().  The
+# application may call invalidate_paths() if files or directories are
+# added, removed or renamed in a way that would change a resolution.
+path_cache = dict()
+
+# Application may set this to True to validate memoized resolve()
+# results against the modification time of the searched directories.
+resolve_check_mtime = False
+
+
+def invalidate_paths():
+    '''
+    Forget all memoized path resolutions.
+    '''
+    path_cache.clear()
+
+
+def dir_stamps(dirs):
+    '''
+    Return list of modification times of directories, None if missing.
+    '''
+    ret = list()
+    for one in dirs:
+        try:
+            ret.append(os.stat(one).st_mtime_ns)
+        except OSError:
+            ret.append(None)
+    return ret
+
+
 def clean_paths(paths, add_cwd=True):
     '''Return list of paths made absolute with cwd as first .
 
@@ -212,6 +242,11 @@ def clean_paths(paths, add_cwd=True):
     '''
     if isinstance(paths, str):
         paths = paths.split(":")
+    key = ("clean", tuple(paths), add_cwd, os.getcwd())
+    got = path_cache.get(key)
+    if got is not None:
+        return list(got)
+
     paths = [os.path.realpath(p) for p in paths]
 
     if add_cwd:
@@ -219,6 +254,7 @@ def clean_paths(paths, add_cwd=True):
         if cwd not in paths:
             paths.insert(0, cwd)
 
+    path_cache[key] = tuple(paths)
     return paths
 
 
@@ -237,6 +273,11 @@ def search_path(likename, paths=None):
     provided by moo.  Thus, user may override built-in files.
     '''
     user = list(paths or list())
+    key = ("search", likename, tuple(user), os.getcwd())
+    got = path_cache.get(key)
+    if got is not None:
+        return list(got)
+
     sp = list()
 
     # these go first to adhere to principle of least surprise
@@ -265,6 +306,7 @@ def search_path(likename, paths=None):
             continue
         sp.append(bi)
 
+    path_cache[key] = tuple(sp)
     return sp
 
 def resolve(filename, paths=()):
@@ -273,6 +315,10 @@ def resolve(filename, paths=()):
 
     Raise ValueError if fail.
 
+    Successful resolutions are memoized, see invalidate_paths() and
+    resolve_check_mtime.  A memoized file which no longer exists is
+    resolved again.
+
     '''
     if not filename:
         raise ValueError("no file name provided")
@@ -280,11 +326,26 @@ def resolve(filename, paths=()):
         if os.path.exists(filename):
             return filename
         raise ValueError(f'absolute path not found: {filename}')
+
+    key = ("resolve", filename, tuple(paths or ()), os.getcwd())
+    got = path_cache.get(key)
+    if got is not None:
+        fp, dirs, stamps = got
+        if resolve_check_mtime:
+            if dir_stamps(dirs) == stamps:
+                return fp
+        elif os.path.exists(fp):  # not removed since
+            return fp
+
     paths = search_path(filename, paths)
 
+    dirs = list()
     for maybe in clean_paths(paths):
         fp = os.path.join(maybe, filename)
+        dirs.append(os.path.dirname(fp))
         if os.path.exists(fp):
+            stamps = dir_stamps(dirs) if resolve_check_mtime else None
+            path_cache[key] = (fp, dirs, stamps)
             return fp
     raise ValueError(f"file not found: {filename}")
 
@@ -31,3 +31,21 @@ validate () {
     validate fail
 }
 
+@test "check native validator" {
+    local tfile="$BATS_TEST_DIRNAME/issue17.jsonnet"
+    for kind in pass fail ; do
+        local want=$(moo validate --passfail -s hier:$tfile \
+                         -t ${kind}.schema:$tfile ${kind}.models:$tfile)
+        local got=$(moo validate --passfail -V native -s hier:$tfile \
+                        -t ${kind}.schema:$tfile ${kind}.models:$tfile)
+        [ "$got" = "$want" ]
+    done
+}
+
+@test "check negative jobs are refused" {
+    local tfile="$BATS_TEST_DIRNAME/issue17.jsonnet"
+    run moo validate -j -1 -s hier:$tfile -t pass.schema:$tfile pass.models:$tfile
+    echo "$output"
+    [ "$status" -eq 2 ]
+    [[ $output =~ "Invalid value" ]]
+}
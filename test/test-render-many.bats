@@ -0,0 +1,55 @@
+#!/usr/bin/env bats
+
+@test "render many serially" {
+    local out="$BATS_TMPDIR/render-many-serial"
+    rm -rf "$out"
+    run moo -T test render-many -o "$out" test/render-many.jsonnet
+    echo "$output"
+    [ "$status" -eq 0 ]
+    [[ "$(cat $out/sub1/file3.txt)" == "file3 is number 3" ]]
+}
+
+@test "render many in parallel matches serial" {
+    local ser="$BATS_TMPDIR/render-many-ser"
+    local par="$BATS_TMPDIR/render-many-par"
+    rm -rf "$ser" "$par"
+    run moo -T test render-many -o "$ser" test/render-many.jsonnet
+    [ "$status" -eq 0 ]
+    run moo -T test render-many -j 3 -o "$par" test/render-many.jsonnet
+    echo "$output"
+    [ "$status" -eq 0 ]
+    diff -r "$ser" "$par"
+}
+
+@test "render many in parallel reports failed entries" {
+    local out="$BATS_TMPDIR/render-many-bad"
+    rm -rf "$out"
+    run moo -T test -A bad=true render-many -j 3 -o "$out" test/render-many.jsonnet
+    echo "$output"
+    [ "$status" -ne 0 ]
+    [[ $output =~ "entry 8 (bad.txt) failed" ]]
+    [ -f "$out/sub0/file0.txt" ]
+}
+
+@test "render many skips up to date outputs" {
+    local out="$BATS_TMPDIR/render-many-incr"
+    rm -rf "$out"
+    run moo -T test render-many -o "$out" test/render-many.jsonnet
+    [ "$status" -eq 0 ]
+    [ -f "$out/.moo-render-manifest.json" ]
+    local before="$(stat -c %y $out/sub0/file2.txt)"
+    echo "garbage" > "$out/sub1/file3.txt"
+    sleep 1
+    run moo -T test render-many -o "$out" test/render-many.jsonnet
+    echo "$output"
+    [ "$status" -eq 0 ]
+    [[ "$before" == "$(stat -c %y $out/sub0/file2.txt)" ]]
+    [[ "$(cat $out/sub1/file3.txt)" == "file3 is number 3" ]]
+}
+
+@test "render many refuses negative jobs" {
+    run moo -T test render-many -j -1 -o "$BATS_TMPDIR/render-many-neg" test/render-many.jsonnet
+    echo "$output"
+    [ "$status" -eq 2 ]
+    [[ $output =~ "Invalid value" ]]
+}
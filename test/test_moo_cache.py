@@ -0,0 +1,80 @@
+import os
+import moo.cache
+import moo.jsonnet
+
+
+def test_disk_cache(tmp_path):
+    'Check store, retrieve and eviction'
+    cache = moo.cache.DiskCache("test", path=str(tmp_path), size=100)
+    assert cache.get("a") is None
+    cache.put("a", dict(x=1))
+    assert cache.get("a") == dict(x=1)
+    cache.put("b", "x"*60)
+    cache.put("c", "y"*60)
+    assert cache.get("b") is None
+    assert cache.get("c") == "y"*60
+
+
+def test_jsonnet_cache(tmp_path, monkeypatch):
+    'Check cached Jsonnet evaluation follows changes to imports'
+    monkeypatch.setattr(moo.cache, "directory", str(tmp_path / "cache"))
+    lib = tmp_path / "lib.libsonnet"
+    main = tmp_path / "main.jsonnet"
+    lib.write_text('{x: 1}')
+    main.write_text('function(y) (import "lib.libsonnet") {y: y}')
+
+    kwds = dict(tla_codes=dict(y="2"))
+    assert moo.jsonnet.load(str(main), **kwds) == dict(x=1, y=2)
+    assert len(os.listdir(tmp_path / "cache" / "jsonnet")) == 1
+    assert moo.jsonnet.load(str(main), **kwds) == dict(x=1, y=2)
+
+    kwds = dict(tla_codes=dict(y="3"))
+    assert moo.jsonnet.load(str(main), **kwds) == dict(x=1, y=3)
+
+    lib.write_text('{x: 10}')
+    assert moo.jsonnet.load(str(main), **kwds) == dict(x=10, y=3)
+
+    monkeypatch.setattr(moo.cache, "enabled", False)
+    lib.write_text('{x: 100}')
+    assert moo.jsonnet.load(str(main), **kwds) == dict(x=100, y=3)
+
+
+def test_jsonnet_cache_shadow(tmp_path, monkeypatch):
+    'Check a new file shadowing an import invalidates cached evaluation'
+    monkeypatch.setattr(moo.cache, "directory", str(tmp_path / "cache"))
+    a = tmp_path / "a"
+    b = tmp_path / "b"
+    a.mkdir()
+    b.mkdir()
+    main = tmp_path / "main.jsonnet"
+    main.write_text('import "lib.libsonnet"')
+    (b / "lib.libsonnet").write_text('{x: "from b"}')
+    paths = [str(a), str(b)]
+
+    assert moo.jsonnet.load(str(main), paths) == dict(x="from b")
+    (a / "lib.libsonnet").write_text('{x: "from a"}')
+    assert moo.jsonnet.load(str(main), paths) == dict(x="from a")
+
+
+def test_jsonnet_cache_null(tmp_path, monkeypatch):
+    'Check null evaluation is served from the cache'
+    monkeypatch.setattr(moo.cache, "directory", str(tmp_path / "cache"))
+    main = tmp_path / "main.jsonnet"
+    main.write_text('null')
+    assert moo.jsonnet.load(str(main)) is None
+    calls = list()
+    real = moo.jsonnet.evaluate_file
+    monkeypatch.setattr(moo.jsonnet, "evaluate_file",
+                        lambda *a, **k: calls.append(a) or real(*a, **k))
+    assert moo.jsonnet.load(str(main)) is None
+    assert not calls
+
+
+def test_jsonnet_cache_code(tmp_path, monkeypatch):
+    'Check changes to moo code invalidate cached evaluation'
+    monkeypatch.setattr(moo.cache, "directory", str(tmp_path / "cache"))
+    main = tmp_path / "main.jsonnet"
+    main.write_text('{x: 1}')
+    key = moo.jsonnet.cache_key(str(main), [], {})
+    monkeypatch.setattr(moo.jsonnet, "_code_digest", "other")
+    assert moo.jsonnet.cache_key(str(main), [], {}) != key
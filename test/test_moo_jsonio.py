@@ -0,0 +1,76 @@
+import json
+import pytest
+import moo.io
+import moo.jsonio
+from moo.util import select_path
+
+data = {
+    "a": [1, -2.5e3, "s\"t]r{", None, True, {"b": {"c": [[], {}, "x"]}}],
+    "d": {"e": "é\\", "f": [{"g": 1}, {"g": 2}]},
+    "h": "tail",
+}
+
+
+@pytest.mark.parametrize("dpath", [
+    "", "a", "a.0", "a.1", "a.2", "a.3", "a.4", "a.5.b.c", "a.5.b.c.2",
+    "a.-1.b", "d.e", "d.f.1.g", "h", "h.0"])
+def test_select(tmp_path, dpath):
+    'Check streaming selection matches full load selection'
+    fname = tmp_path / "data.json"
+    fname.write_text(json.dumps(data, indent=2))
+    got = moo.jsonio.load(str(fname), dpath=dpath)
+    assert got == select_path(data, dpath)
+    if dpath:
+        assert moo.io.load(str(fname), dpath=dpath) == got
+
+
+def test_select_missing(tmp_path):
+    'Check missing selections raise as select_path() does'
+    fname = tmp_path / "data.json"
+    fname.write_text(json.dumps(data))
+    with pytest.raises(KeyError):
+        moo.jsonio.load(str(fname), dpath="d.dne")
+    with pytest.raises(IndexError):
+        moo.jsonio.load(str(fname), dpath="a.10")
+    with pytest.raises(TypeError):
+        moo.jsonio.load(str(fname), dpath="a.x")
+
+
+def test_lines(tmp_path):
+    'Check JSON Lines loading'
+    fname = tmp_path / "data.jsonl"
+    fname.write_text('\n'.join([json.dumps(data)]*3 + ['', '{"x": 42}', '']))
+    assert len(moo.io.load(str(fname))) == 4
+    assert moo.io.load(str(fname), dpath="3.x") == 42
+    assert moo.io.load(str(fname), dpath="-1.x") == 42
+    assert moo.io.load(str(fname), dpath="1.d.f.0") == dict(g=1)
+
+
+def test_no_data(tmp_path):
+    'Check empty files are refused as by other formats'
+    for name in ("empty.jsonl", "blank.jsonl"):
+        fname = tmp_path / name
+        fname.write_text("" if name == "empty.jsonl" else "\n\n")
+        with pytest.raises(ValueError):
+            moo.io.load(str(fname))
+    # a selected null is data
+    fname = tmp_path / "null.json"
+    fname.write_text('{"a": null}')
+    assert moo.io.load(str(fname), dpath="a") is None
+    fname = tmp_path / "null.jsonl"
+    fname.write_text('{"a": null}\n')
+    assert moo.io.load(str(fname), dpath="0.a") is None
+
+
+def test_select_large(tmp_path, monkeypatch):
+    'Check vectorized skipping across tiny windows and escapes'
+    monkeypatch.setattr(moo.jsonio.Scanner, "small", 1)
+    monkeypatch.setattr(moo.jsonio.Scanner, "window", 3)
+    monkeypatch.setattr(moo.jsonio.Scanner, "max_window", 7)
+    tricky = ["]", "\\", "\\\"[", "\\\\", "}{\"\\\\\"", "x"*10 + "\\\\\\\"]"]
+    big = {"skip%d" % n: [tricky, {"t": tricky}] * n for n in range(5)}
+    big["want"] = [tricky, 42]
+    fname = tmp_path / "data.json"
+    fname.write_text(json.dumps(big))
+    assert moo.jsonio.load(str(fname), dpath="want") == big["want"]
+    assert moo.jsonio.load(str(fname), dpath="skip4.3.t") == tricky
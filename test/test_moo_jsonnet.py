@@ -0,0 +1,62 @@
+import moo.jsonnet
+
+
+def test_import_cache(tmp_path):
+    'Check import cache reuses content and notices changes'
+    cache = moo.jsonnet.ImportCache()
+    lib = tmp_path / "lib.libsonnet"
+    main = tmp_path / "main.jsonnet"
+    lib.write_text('{x: 1}')
+    main.write_text('(import "lib.libsonnet") + (import "lib.libsonnet")')
+
+    ic = moo.jsonnet.ImportCallback([str(tmp_path)], cache=cache)
+    assert ic(str(tmp_path), "lib.libsonnet")[1] == b'{x: 1}'
+    assert ic(str(tmp_path), "lib.libsonnet")[1] == b'{x: 1}'
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["hits"] == 1
+
+    # a missing candidate is remembered as a negative entry
+    ic = moo.jsonnet.ImportCallback([str(tmp_path)], cache=cache)
+    ic(str(tmp_path / "sub"), "lib.libsonnet")
+    ic(str(tmp_path / "sub"), "lib.libsonnet")
+    assert cache.stats()["negative"] == 1
+    assert cache.stats()["misses"] == 2
+
+    lib.write_text('{x: 22}')
+    ic = moo.jsonnet.ImportCallback([str(tmp_path)], cache=cache)
+    assert ic(str(tmp_path), "lib.libsonnet")[1] == b'{x: 22}'
+
+
+def test_native_callbacks():
+    'Native helpers give the same results as the pure Jsonnet ones'
+    import json
+    import pytest
+    from moo.jsonnet import evaluate_snippet, ImportCallback, merge_patch
+
+    assert merge_patch({"a": {"b": 1, "c": 2}}, {"a": {"c": None, "d": 3}}) \
+        == {"a": {"b": 1, "d": 3}}
+    assert merge_patch({"a": 1}, {"a": {"b": None, "c": 1}}) \
+        == {"a": {"c": 1}}
+    assert merge_patch({"a": 1}, [1]) == [1]
+
+    code = '''
+local os = import "oschema.jsonnet";
+local c = os.schema("top.c");
+local b = os.schema("top.b");
+local n = c.number("N", "i4", doc=null);
+local s = b.sequence("S", n);
+local r = b.record("R", [os.field("s", s), os.field("n", n, default=null)]);
+local e = os.schema("top").enum("E", ["x", "y"]);
+local types = [r, e, s, n];
+{hier: os.hier(types), sorted: os.sort_select(types), flat: os.flathier(types)}
+'''
+    native = moo.jsonnet.loads(code)
+    pure = json.loads(evaluate_snippet("<stdin>", code,
+                                       import_callback=ImportCallback()))
+    assert native == pure
+    assert [t["name"] for t in native["sorted"]] == ["E", "N", "S", "R"]
+
+    cycle = 'local ts = import "toposort.jsonnet"; ' \
+        'ts().toposort({a: {deps: ["b"]}, b: {deps: ["c"]}, c: {deps: ["b"]}})'
+    with pytest.raises(RuntimeError, match="not a DAG: b -> c -> b"):
+        moo.jsonnet.loads(cycle)
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+
+import gc
+import pytest
+from moo.oschema import (TypeRegistry, default_registry, known_types,
+                         from_dict, typify, untypify, Namespace)
+
+
+def schema(path="reg.test", count_dtype="i4"):
+    return [
+        dict(name="Count", schema="number", dtype=count_dtype, path=path.split(".")),
+        dict(name="Counts", schema="sequence", items=f"{path}.Count",
+             path=path.split(".")),
+        dict(name="Rec", schema="record", path=path.split("."), fields=[
+            dict(name="n", item=f"{path}.Count"),
+            dict(name="ns", item=f"{path}.Counts")]),
+    ]
+
+
+def test_default_registry():
+    'Types register in the default registry unless told otherwise'
+    assert known_types is default_registry
+    types = typify(schema("reg.default"))
+    assert default_registry["reg.default.Rec"] is types[-1]
+    assert types[-1](n=1, ns=[2, 3]) == dict(n=1, ns=[2, 3])
+    assert default_registry.evict("reg.default") == 3
+    assert "reg.default.Count" not in default_registry
+
+
+def test_own_registry():
+    'Types resolve through their own registry'
+    reg = TypeRegistry()
+    types = typify(schema(), reg)
+    assert sorted(reg) == ["reg.test.Count", "reg.test.Counts", "reg.test.Rec"]
+    assert "reg.test.Rec" not in default_registry
+    rec = types[-1]
+    assert rec.js["properties"]["ns"]["items"] == dict(type="integer")
+    assert rec(n=1, ns=[2]) == dict(n=1, ns=[2])
+
+    # a new version of the schema in another registry does not shadow
+    other = TypeRegistry()
+    new = typify(schema(count_dtype="f4"), other)
+    assert new[-1].js["properties"]["n"] == dict(type="number")
+    assert rec.js["properties"]["n"] == dict(type="integer")
+
+    assert untypify(types) == untypify([from_dict(d, reg) for d in untypify(types)])
+
+    ns = Namespace("top", registry=reg)
+    ns.namespace("sub").number("Real", dtype="f8")
+    assert "top.sub.Real" in reg
+    assert reg.evict(["top"]) == 1
+    assert reg.evict() == 3
+    assert len(reg) == 0
+
+
+def test_weak_registry():
+    'A weak registry holds types only while they are used'
+    reg = TypeRegistry(weak=True)
+    for _ in range(3):          # eg, reloading a schema
+        types = typify(schema(), reg)
+        assert types[-1](n=1, ns=[2]) == dict(n=1, ns=[2])
+        assert len(reg) == 3
+    del types
+    gc.collect()
+    assert len(reg) == 0
+    with pytest.raises(KeyError):
+        reg["reg.test.Rec"]
+
+
+class Node:
+    def __init__(self, *deps):
+        self.deps = list(deps)
+
+
+def test_toposort():
+    'Types follow their deps in depth first order'
+    from moo.oschema import toposort, toposort_levels
+    graph = dict(a=Node("b", "c"), b=Node("d"), c=Node("d", "x"), d=Node(),
+                 e=Node())
+    assert toposort(graph) == ["d", "b", "c", "a", "e"]
+    assert toposort_levels(graph) == [["d", "e"], ["b", "c"], ["a"]]
+
+    deep = {f"n{ind}": Node(f"n{ind+1}") for ind in range(10000)}
+    order = toposort(deep)
+    assert order[0] == "n9999" and order[-1] == "n0"
+    assert len(toposort_levels(deep)) == 10000
+
+
+def test_toposort_cycle():
+    'A cycle is reported in full'
+    from moo.oschema import toposort
+    graph = dict(a=Node("b"), b=Node("c"), c=Node("d"), d=Node("b"))
+    with pytest.raises(ValueError, match="not a DAG: b -> c -> d -> b"):
+        toposort(graph)
+    with pytest.raises(ValueError, match="not a DAG: a -> a"):
+        toposort(dict(a=Node("a")))
@@ -3,6 +3,7 @@ Test moo.otypes.
 '''
 
 import os
+import importlib.util
 import moo
 import pytest
 from moo.jsonschema import format_checker
@@ -125,3 +126,366 @@ def test_issue10():
     from test.issue10 import Thing
     thing = Thing()
     print(thing.pod())
+
+
+def test_cached_types(tmp_path, monkeypatch):
+    'Make otypes via a module cached on disk'
+    monkeypatch.setattr(moo.cache, "directory", str(tmp_path))
+    path = "test.cached"
+    schema = [
+        dict(name="Count", schema="number", dtype="i4", path=path,
+             constraints=dict(minimum=0)),
+        dict(name="Counter", schema="record", path=path,
+             fields=[dict(name="count", item=path+".Count", default=0)]),
+    ]
+    types = moo.otypes.make_types(schema, cache=True)
+    assert list(types) == [path+".Count", path+".Counter"]
+    assert len(list((tmp_path / "otypes").glob("otypes_*.py"))) == 1
+    assert types[path+".Counter"]().pod() == dict(count=0)
+
+    # a second time runs the cached module without generating source
+    def fail(schema):
+        raise AssertionError("source generated")
+    monkeypatch.setattr(moo.otypes, "module_source", fail)
+    types = moo.otypes.make_types(schema, cache=True)
+    from test.cached import Counter
+    assert Counter(count=3).count == 3
+    with pytest.raises(ValueError):
+        Counter(count=-1)
+
+    # byte code counts toward the size and is evicted with its module
+    cache = moo.otypes.ModuleCache()
+    (src,) = [e[2] for e in cache.entries()]
+    pyc = importlib.util.cache_from_source(src)
+    if not os.path.exists(pyc): # eg, PYTHONDONTWRITEBYTECODE
+        os.makedirs(os.path.dirname(pyc), exist_ok=True)
+        with open(pyc, "wb") as fp:
+            fp.write(b"x" * 10)
+    assert cache.entries()[0][1] == os.path.getsize(src) + os.path.getsize(pyc)
+    cache.clear()
+    assert not os.path.exists(pyc)
+
+
+def test_cache_opt_in(tmp_path, monkeypatch):
+    'Modules are only cached on disk when asked'
+    monkeypatch.setattr(moo.cache, "directory", str(tmp_path))
+    schema = [dict(name="Count", schema="number", dtype="i4",
+                   path="test.optin")]
+    moo.otypes.make_types(schema)
+    assert not (tmp_path / "otypes").exists()
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_compact(compact):
+    'Compact records give the same results as the usual ones'
+    path = f"test.compact{int(compact)}"
+    schema = [
+        dict(name="Age", schema="number", dtype="i4", path=path,
+             constraints=dict(minimum=0)),
+        dict(name="Name", schema="string", pattern="^[A-Z][a-z]*$", path=path),
+        dict(name="Pet", schema="enum", symbols=["cat", "dog"],
+             default="cat", path=path),
+        dict(name="Person", schema="record", path=path, fields=[
+            dict(name="name", item=path+".Name"),
+            dict(name="age", item=path+".Age", default=42),
+            dict(name="pet", item=path+".Pet", optional=True)]),
+        dict(name="People", schema="sequence", items=path+".Person", path=path),
+        dict(name="Family", schema="record", path=path, fields=[
+            dict(name="people", item=path+".People")]),
+    ]
+    types = moo.otypes.make_types(schema, cache=False, compact=compact)
+    Person = types[path+".Person"]
+    Family = types[path+".Family"]
+
+    bob = Person(name="Bob", pet="dog")
+    assert bob.pod() == dict(name="Bob", age=42, pet="dog")
+    bob.age = 7
+    assert bob.age == 7
+    with pytest.raises(ValueError):
+        bob.age = -1
+    with pytest.raises(ValueError):
+        bob.name = "bob"
+    assert Person(bob).pod() == dict(name="Bob", age=7, pet="dog")
+    with pytest.raises(AttributeError):
+        Person(age=3).pod()
+
+    fam = Family(people=[bob, dict(name="Ann")])
+    assert fam.pod() == dict(people=[dict(name="Bob", age=7, pet="dog"),
+                                     dict(name="Ann", age=42)])
+    assert hasattr(bob, "__dict__") != compact
+    assert hasattr(types[path+".Age"](1), "__dict__") != compact
+
+
+def test_number_native():
+    'Number values match those from numpy, as of old'
+    import math
+    import random
+    import warnings
+    import numpy
+
+    def reference(val, dtype):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            try:
+                got = numpy.array(val, dtype).item()
+            except Exception as err:
+                return type(err)
+        if numpy.dtype(dtype) == numpy.dtype('f4'):
+            return float('%.6e' % got)
+        return got
+
+    rng = random.Random(42)
+    values = [0, 1, -1, 127, 128, -129, 255, 256, 2**31, 2**32, -2**63,
+              2**64, 2**53 + 1, 10**400, 3.7, -3.7, 0.1, 1e-45, 3.4e38,
+              3.5e38, 1e300, -0.0, float('inf'), float('nan'), "12", "1.5"]
+    values += [rng.uniform(-1e6, 1e6) for _ in range(200)]
+    values += [rng.randint(-2**40, 2**40) for _ in range(200)]
+    for dtype in ("i1", "u1", "i4", "u2", "i8", "u8", "f2", "f4", "f8"):
+        Num = moo.otypes.make_type(name="Num" + dtype, schema="number",
+                                   dtype=dtype, path="test.native")
+        for val in values:
+            want = reference(val, dtype)
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                try:
+                    got = Num(val).pod()
+                except Exception as err:
+                    got = type(err)
+            if isinstance(want, float) and math.isnan(want):
+                assert math.isnan(got), (dtype, val)
+                continue
+            assert type(got) == type(want), (dtype, val, got, want)
+            assert got == want, (dtype, val)
+
+
+def test_number_sequence():
+    'Sequences of numbers are held in arrays'
+    import numpy
+    path = "test.numseq"
+    moo.otypes.make_types([
+        dict(name="Chan", schema="number", dtype="u4", path=path,
+             constraints=dict(maximum=1000)),
+        dict(name="Chans", schema="sequence", items=path+".Chan", path=path),
+        dict(name="Gain", schema="number", dtype="f4", path=path),
+        dict(name="Gains", schema="sequence", items=path+".Gain", path=path),
+    ], cache=False)
+    from test.numseq import Chan, Chans, Gain, Gains
+
+    chans = Chans([1, 2.7, "3", Chan(4)])
+    assert chans.pod() == [1, 2, 3, 4]
+    assert all(type(one) is int for one in chans.pod())
+    assert Chans([]).pod() == []
+
+    arr = numpy.arange(10, dtype='u4')
+    chans = Chans(arr)
+    buf = chans.pod(buffer=True)
+    assert numpy.shares_memory(buf, arr)
+    assert not buf.flags.writeable
+    assert Chans(chans).pod() == list(range(10))
+    assert Chans(numpy.arange(3, dtype='i8')).pod() == [0, 1, 2]
+
+    with pytest.raises(ValueError) as err:
+        Chans([10, 1001, 2000])
+    assert str(err.value) == 'illegal Chan number 1001 not less than or equal 1000'
+    with pytest.raises(ValueError):
+        Chans(numpy.array([5, 5000], dtype='u4'))
+    with pytest.raises(ValueError):
+        Chans([True])
+    with pytest.raises(OverflowError):
+        Chans([-1])
+
+    vals = [0.1, 1/3, 7, 1e10]
+    assert Gains(vals).pod() == [Gain(one).pod() for one in vals]
+    assert Gains(vals).pod(buffer=True).dtype == numpy.dtype('f4')
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_make_many(compact):
+    'Make many records in one call'
+    path = f"test.many{int(compact)}"
+    types = moo.otypes.make_types([
+        dict(name="Count", schema="number", dtype="i4", path=path,
+             constraints=dict(minimum=0)),
+        dict(name="Name", schema="string", pattern="^[a-z]+$", path=path),
+        dict(name="Item", schema="record", path=path, fields=[
+            dict(name="count", item=path+".Count"),
+            dict(name="name", item=path+".Name", default="none")]),
+        dict(name="Items", schema="sequence", items=path+".Item", path=path),
+    ], cache=False, compact=compact)
+    Item = types[path+".Item"]
+    Items = types[path+".Items"]
+
+    data = [dict(count=n, name="abc"[:n % 3 + 1]) for n in range(10)]
+    data[3]["name"] = None
+    data.append(Item(count=42))
+    data.append(dict(count=7))
+    many = moo.otypes.make_many(Item, data)
+    assert [one.pod() for one in many] == \
+        [Item(one).pod() for one in data]
+    assert many[-1].name == Item(count=7).name == "none"
+    assert [one.name for one in many] == [Item(one).name for one in data]
+
+    seq = moo.otypes.from_records(Items, data)
+    assert isinstance(seq, Items)
+    assert seq.pod() == Items(data).pod()
+
+    data[2]["count"] = -1
+    data[5]["name"] = "BAD"
+    data[7]["count"] = "seven"
+    with pytest.raises(ValueError) as err:
+        moo.otypes.make_many(Item, data)
+    msg = str(err.value)
+    assert "invalid at indices [2, 5, 7]" in msg
+    assert "illegal Count number -1 not greater than or equal 0" in msg
+
+    assert [one.pod() for one in moo.otypes.make_many(types[path+".Count"], [1, 2])] == [1, 2]
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_deferred(compact):
+    'Record fields set in deferred mode are validated later'
+    path = f"test.deferred{int(compact)}"
+    types = moo.otypes.make_types([
+        dict(name="Count", schema="number", dtype="i4", path=path,
+             constraints=dict(minimum=0)),
+        dict(name="Name", schema="string", pattern="^[a-z]+$", path=path),
+        dict(name="Item", schema="record", path=path, fields=[
+            dict(name="count", item=path+".Count"),
+            dict(name="name", item=path+".Name", default="none")]),
+        dict(name="Box", schema="record", path=path, fields=[
+            dict(name="item", item=path+".Item")]),
+    ], cache=False, compact=compact)
+    Item = types[path+".Item"]
+    Box = types[path+".Box"]
+
+    with pytest.raises(ValueError):
+        Item(count=-1)
+
+    with moo.otypes.deferred():
+        item = Item(count=-1, name="BAD")
+        item.count = 3          # overwrites the invalid value
+        box = Box(item=dict(count=-2))
+    with pytest.raises(ValueError):
+        item.validate()
+    item.name = "good"
+    assert item.validate() is item
+    assert item.pod() == dict(count=3, name="good")
+    assert item.count == 3
+
+    with pytest.raises(ValueError):
+        box.pod()
+    with pytest.raises(ValueError):
+        box.validate()
+
+    with moo.otypes.deferred():
+        item = Item(name="abc")
+    with pytest.raises(AttributeError):
+        item.validate()
+
+
+def test_string_checks():
+    'String pattern and format checks agree with JSON Schema'
+    import jsonschema
+    cases = [
+        (dict(pattern="[0-9]+"), ["123", "a1b", "abc", ""]),
+        (dict(pattern="^[a-z]+$"), ["abc", "aBc", "abc\n", ""]),
+        (dict(format="ipv4"), ["127.0.0.1", "1.2.3", "& not @ ip"]),
+        (dict(format="email"), ["me@example.com", "1;2;3#4"]),
+        (dict(format="hostname"), ["example.com", "-bad-.com"]),
+        (dict(format="no-such-format"), ["anything"]),
+        (dict(pattern="^[a-z]+$", format="hostname"), ["abc", "ABC"]),
+    ]
+    for ind, (kwds, values) in enumerate(cases):
+        Str = moo.otypes.make_type(name=f"Str{ind}", schema="string",
+                                   path="test.strings", **kwds)
+        schema = dict(type="string", **kwds)
+        for val in values:
+            try:
+                jsonschema.validate(val, schema, format_checker=format_checker)
+            except jsonschema.ValidationError:
+                want = False
+            else:
+                want = True
+            try:
+                Str(val)
+            except ValueError:
+                got = False
+            else:
+                got = True
+            assert got == want, (kwds, val)
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_pickle(compact):
+    'Types and their instances unpickle, also in a fresh process'
+    import sys
+    import json
+    import pickle
+    import subprocess
+    path = ["test", "pickle", "compact" if compact else "usual"]
+    fqn = '.'.join(path)
+    schema = [
+        dict(name="Count", schema="number", dtype="i4", path=path),
+        dict(name="Name", schema="string", pattern="^[a-z]+$", path=path),
+        dict(name="Counts", schema="sequence", items=f"{fqn}.Count", path=path),
+        dict(name="Rec", schema="record", path=path, fields=[
+            dict(name="n", item=f"{fqn}.Count"),
+            dict(name="s", item=f"{fqn}.Name", default="x"),
+            dict(name="c", item=f"{fqn}.Counts")]),
+    ]
+    types = moo.otypes.make_types(schema, cache=False, compact=compact)
+    Rec = types[f"{fqn}.Rec"]
+    rec = Rec(n=3, c=[1, 2, 3])
+    assert pickle.loads(pickle.dumps(Rec)) is Rec
+    got = pickle.loads(pickle.dumps(rec))
+    assert type(got) is Rec
+    assert got.pod() == rec.pod()
+    counts = got._v_c if compact else got._value["c"]
+    assert not counts._value.flags.writeable
+
+    code = '''
+import sys, json, pickle
+obj = pickle.loads(sys.stdin.buffer.read())
+obj.n = 4
+print(json.dumps([type(obj).__module__, obj.pod()]))
+'''
+    res = subprocess.run([sys.executable, "-c", code], check=True,
+                         input=pickle.dumps(rec), capture_output=True)
+    mod, pod = json.loads(res.stdout)
+    assert mod == fqn
+    assert pod == dict(rec.pod(), n=4)
+
+
+def test_lazy():
+    'Lazy types are made on first use along with their dependencies'
+    from moo.otypes import make_types, get_type, pending
+    path = ["test", "lazy"]
+    schema = [
+        dict(name="Count", schema="number", dtype="i4", path=path),
+        dict(name="Counts", schema="sequence", items="test.lazy.Count",
+             path=path),
+        dict(name="Name", schema="string", path=path),
+        dict(name="Rec", schema="record", path=path, fields=[
+            dict(name="c", item="test.lazy.Counts")]),
+        dict(name="LazyNoPath", schema="string"),
+    ]
+    types = make_types(schema, lazy=True)
+    assert sorted(types) == sorted(["test.lazy.Count", "test.lazy.Counts",
+                                    "test.lazy.Name", "test.lazy.Rec",
+                                    "moo.otypes.LazyNoPath"])
+    assert "test.lazy.Rec" in pending
+
+    from test.lazy import Rec
+    assert Rec(c=[1, 2]).pod() == dict(c=[1, 2])
+    assert "test.lazy.Rec" not in pending
+    assert "test.lazy.Count" not in pending
+    assert "test.lazy.Name" in pending
+
+    assert types["test.lazy.Rec"] is Rec
+    assert get_type("test.lazy.Name")("x").pod() == "x"
+    assert types["moo.otypes.LazyNoPath"]("y").pod() == "y"
+    assert not [one for one in pending if "lazy" in one.lower()]
+
+    import test.lazy
+    with pytest.raises(AttributeError):
+        test.lazy.NoSuchType
@@ -0,0 +1,92 @@
+import os
+import json
+import base64
+import threading
+import moo.util
+import moo.cache
+import moo.serve
+
+testdir = os.path.dirname(os.path.realpath(__file__))
+
+
+def test_serve(tmp_path, monkeypatch):
+    'Run commands through a server and stop it'
+    # the server changes process-wide settings
+    monkeypatch.setattr(moo.util, "resolve_check_mtime", False)
+    monkeypatch.setattr(moo.cache, "directory", str(tmp_path / "cache"))
+    settings = (moo.cache.enabled, moo.cache.modules)
+    sock = str(tmp_path / "moo.sock")
+    thread = threading.Thread(target=moo.serve.serve, args=(sock,))
+    thread.start()
+    for _ in range(100):
+        if os.path.exists(sock):
+            break
+        thread.join(0.1)
+
+    def run(*argv):
+        res = moo.serve.request(sock, dict(argv=list(argv), cwd=testdir, env={}))
+        return res["status"], base64.b64decode(res["stdout"]), res["stderr"]
+
+    try:
+        status, out, _ = run("version")
+        assert status == 0
+        assert out.decode().strip() == moo.__version__
+
+        status, out, _ = run("compile", "issue2.jsonnet")
+        assert status == 0
+        assert json.loads(out.decode()) == moo.io.load(os.path.join(testdir, "issue2.jsonnet"))
+
+        outdir = tmp_path / "out"
+        status, _, _ = run("-T", testdir, "render-many", "-o", str(outdir),
+                           "render-many.jsonnet")
+        assert status == 0
+        assert (outdir / "sub1" / "file1.txt").read_text() == "file1 is number 1"
+
+        status, _, err = run("compile", "does-not-exist.jsonnet")
+        assert status != 0
+        assert "file not found" in err
+
+        status, _, _ = run("serve")
+        assert status != 0
+    finally:
+        moo.serve.request(sock, dict(stop=True))
+        thread.join(10)
+    assert not thread.is_alive()
+    assert not os.path.exists(sock)
+    # commands do not leak their settings
+    assert (moo.cache.enabled, moo.cache.modules) == settings
+    assert moo.cache.directory == str(tmp_path / "cache")
+
+
+def test_command_name():
+    'Find the subcommand, not an option value or later argument'
+    from moo.__main__ import cli
+    name = lambda *argv: moo.serve.command_name(cli, argv)
+    assert name("serve") == "serve"
+    assert name("-M", "serve", "compile", "serve") == "compile"
+    assert name("--mpath=x", "-Mx", "--no-cache", "render", "serve") == "render"
+    assert name("--", "serve") == "serve"
+    assert name("--no-cache") is None
+
+
+def test_forward_fallback(tmp_path):
+    'Run locally only if no server takes the command'
+    import sys
+    import socket
+    import subprocess
+    sockpath = str(tmp_path / "moo.sock")
+    env = dict(os.environ, MOO_SERVE_SOCKET=sockpath, MOO_SERVE_TIMEOUT="0.5")
+    cmd = [sys.executable, "-c", "import moo.__main__ as m; m.main()", "version"]
+
+    # no server
+    out = subprocess.check_output(cmd, env=env, timeout=30)
+    assert out.decode().strip() == moo.__version__
+
+    # a server which takes the request but does not answer in time
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as busy:
+        busy.bind(sockpath)
+        busy.listen(1)
+        proc = subprocess.run(cmd, env=env, timeout=30, capture_output=True)
+    assert proc.returncode != 0
+    assert proc.stdout == b""
+    assert b"no response from server" in proc.stderr
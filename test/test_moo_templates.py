@@ -17,3 +17,18 @@ def test_relpath():
     assert ["bar"] == relpath("foo.bar", "foo")
     assert ["bar"] == relpath("foo.bar", "foo.baz")
 
+
+def test_candidates(tmp_path):
+    'Check candidates() lists shadowing files before those used'
+    from moo.templates import candidates, imports
+    for one in "mac":
+        (tmp_path / one).mkdir()
+    main = tmp_path / "m" / "main.txt.j2"
+    main.write_text('{% include "sub.txt.j2" %}')
+    (tmp_path / "c" / "sub.txt.j2").write_text('sub')
+    tpath = [str(tmp_path / "a"), str(tmp_path / "c")]
+    got = candidates(str(main), tpath)
+    assert str(main) in got
+    shadow = got.index(str(tmp_path / "a" / "sub.txt.j2"))
+    assert shadow < got.index(str(tmp_path / "c" / "sub.txt.j2"))
+    assert set(imports(str(main), tpath, recursive=True)).issubset(got)
@@ -1,3 +1,4 @@
+import os
 import pytest
 from moo.util import resolve, select_path, clean_paths, graft
 from jsonpointer import JsonPointerException
@@ -33,3 +34,43 @@ def test_graft():
         obj = graft(obj, "/b/c", 42)
     assert obj["a"] == 2
 
+
+
+def test_resolve_memo(tmp_path, monkeypatch):
+    'Check memoized resolving'
+    import moo.util
+    monkeypatch.chdir(tmp_path)
+    first = tmp_path / "first"
+    second = tmp_path / "second"
+    first.mkdir()
+    second.mkdir()
+    (second / "file.jsonnet").write_text("{}")
+    paths = (str(first), str(second))
+
+    got = resolve("file.jsonnet", paths)
+    assert got == str(second / "file.jsonnet")
+
+    # a shadowing file is not seen until invalidated
+    (first / "file.jsonnet").write_text("{}")
+    assert resolve("file.jsonnet", paths) == got
+    moo.util.invalidate_paths()
+    assert resolve("file.jsonnet", paths) == str(first / "file.jsonnet")
+
+    # a removed file is not returned
+    (first / "file.jsonnet").unlink()
+    assert resolve("file.jsonnet", paths) == got
+    (second / "file.jsonnet").unlink()
+    with pytest.raises(ValueError):
+        resolve("file.jsonnet", paths)
+    (second / "file.jsonnet").write_text("{}")
+    (first / "file.jsonnet").write_text("{}")
+
+    # or, when checking mtime, is seen when directory changes
+    monkeypatch.setattr(moo.util, "resolve_check_mtime", True)
+    moo.util.invalidate_paths()
+    (first / "file.jsonnet").unlink()
+    assert resolve("file.jsonnet", paths) == got
+    (first / "file.jsonnet").write_text("{}")
+    later = first.stat().st_mtime + 10  # avoid coarse timestamps
+    os.utime(first, (later, later))
+    assert resolve("file.jsonnet", paths) == str(first / "file.jsonnet")
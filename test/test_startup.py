@@ -0,0 +1,40 @@
+import sys
+import subprocess
+
+# Third party modules which are slow to import and which the moo
+# package and CLI should not import until needed.
+heavy = ("numpy", "jinja2", "jsonschema", "fastjsonschema", "anyconfig",
+         "openpyxl", "_gojsonnet", "_jsonnet")
+
+probe = '''
+import sys
+{code}
+heavy = {heavy!r}
+print("heavy:", *[m for m in heavy if m in sys.modules])
+'''
+
+
+def imported(code):
+    'Return heavy modules imported by running code'
+    out = subprocess.check_output(
+        [sys.executable, "-c", probe.format(code=code, heavy=heavy)])
+    return out.decode().splitlines()[-1].split()[1:]
+
+
+def test_import_moo():
+    'Importing moo and its CLI is light'
+    assert imported("import moo") == []
+    assert imported("import moo.__main__") == []
+
+
+def test_light_commands():
+    'Simple commands do not import heavy modules'
+    for args in (["version"], ["resolve", "moo.jsonnet"], ["path", "j2"]):
+        code = ("from moo.__main__ import cli\n"
+                f"cli.main(args={args!r}, standalone_mode=False)")
+        assert imported(code) == [], args
+
+
+def test_lazy_submodule():
+    'Submodules load on first use'
+    assert "numpy" in imported("import moo\nmoo.otypes")
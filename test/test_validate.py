@@ -33,3 +33,139 @@ def test_regex():
     with pytest.raises(ValidationError):
         validate("wrong", dict(js, type="number"))
 
+
+
+@pytest.mark.parametrize("validator", ["jsonschema", "fastjsonschema"])
+def test_compiled_validator_cache(validator, monkeypatch):
+    'Check a schema is compiled once and errors are ValidationError'
+    import moo.jsonschema
+    from collections import OrderedDict
+    monkeypatch.setattr(moo.jsonschema, "compiled_validators", OrderedDict())
+    monkeypatch.setattr(moo.jsonschema, "max_compiled_validators", 2)
+
+    js = {"$schema": "http://json-schema.org/draft-07/schema#",
+          "type": "integer", "minimum": 0}
+    for num in range(10):
+        moo.jsonschema.validate(num, dict(js), validator)
+    assert len(moo.jsonschema.compiled_validators) == 1
+
+    with pytest.raises(ValidationError):
+        moo.jsonschema.validate(-1, js, validator)
+
+    # bounded
+    for num in range(3):
+        moo.jsonschema.validate(num, dict(js, maximum=num), validator)
+    assert len(moo.jsonschema.compiled_validators) == 2
+
+
+def test_fastjsonschema_defaults():
+    'Check fastjsonschema validation returns the model with defaults'
+    import moo.jsonschema
+    js = {"$schema": "http://json-schema.org/draft-07/schema#",
+          "type": "object",
+          "properties": {"a": {"type": "integer", "default": 42}}}
+    got = moo.jsonschema.validate({}, js, "fastjsonschema")
+    assert got == dict(a=42)
+
+
+@pytest.mark.parametrize("jobs", [None, 2])
+def test_validate_many(jobs):
+    'Check batch validation keeps model order'
+    from moo.ovalid import validate_many
+    js = {"$schema": "http://json-schema.org/draft-07/schema#"}
+    num = dict(js, type="number")
+    text = dict(js, type="string")
+    models = [1, "a", 2, "b", "c", 3]
+    targets = [num, text, dict(num), text, num, text]
+    want = [True, True, True, True, False, False]
+    assert validate_many(models, targets, throw=False, jobs=jobs) == want
+    with pytest.raises(ValidationError) as err:
+        validate_many(models, targets, jobs=jobs)
+    assert "'c' is not of type 'number'" in str(err.value)
+
+
+def diamonds(depth, width=2):
+    'Return schema of layers of records each using all of the layer below'
+    schema = [dict(name="Leaf", schema="number", dtype="u4", path=["d"],
+                   constraints=dict(maximum=9), deps=[])]
+    below = ["d.Leaf"]
+    for layer in range(depth):
+        here = list()
+        for ind in range(width):
+            name = f"R{layer}x{ind}"
+            fields = [dict(name=f"f{n}", item=item) for n, item in enumerate(below)]
+            schema.append(dict(name=name, schema="record", path=["d"],
+                               fields=fields, deps=list(below)))
+            here.append(f"d.{name}")
+        below = here
+    return schema
+
+
+def test_convert_shared_deps():
+    'Conversion of deep shared deps visits each type once'
+    import moo.jsonschema
+    from moo.jsonschema import Converter, convert, get_all_deps
+    from moo.util import pathify
+    schema = diamonds(60)
+    flat = pathify(schema)
+    top = schema[-1]
+    assert len(get_all_deps(flat, top["deps"])) == 2*59 + 1
+
+    convert_ = Converter(schema)
+    js = convert_(top)
+    assert js == convert(top, schema)
+    assert convert_(schema[-2])["$defs"]["d"]["Leaf"] is js["$defs"]["d"]["Leaf"]
+    assert "minimum" not in schema[0]["constraints"] # input untouched
+    assert validate(dict(f0=dict(f0=3), f1=dict(f0=3)), convert_(schema[3]))
+    with pytest.raises(ValidationError):
+        validate(dict(f0=dict(f0=10), f1=dict(f0=3)), convert_(schema[3]))
+
+
+def test_native():
+    'The native validator agrees with JSON Schema validators'
+    from moo.ovalid import validate_many
+    p = ["t", "n"]
+    context = [
+        dict(name="Count", schema="number", dtype="u2", path=p, deps=[]),
+        dict(name="Real", schema="number", dtype="f8", path=p, deps=[],
+             constraints=dict(exclusiveMinimum=0, maximum=10, multipleOf=0.5)),
+        dict(name="Int", schema="number", dtype="i8", path=p, deps=[],
+             constraints=dict(multipleOf=3)),
+        dict(name="Name", schema="string", path=p, deps=[], pattern="[a-z]+"),
+        dict(name="Addr", schema="string", path=p, deps=[], format="ipv4"),
+        dict(name="Flag", schema="boolean", path=p, deps=[]),
+        dict(name="Counts", schema="sequence", items="t.n.Count", path=p,
+             deps=["t.n.Count"]),
+        dict(name="Either", schema="anyOf", types=["t.n.Name", "t.n.Int"],
+             path=p, deps=["t.n.Name", "t.n.Int"]),
+        dict(name="Rec", schema="record", path=p, fields=[
+            dict(name=n, item=f"t.n.{t}") for n, t in [
+                ("count", "Count"), ("real", "Real"), ("int", "Int"),
+                ("name", "Name"), ("addr", "Addr"), ("flag", "Flag"),
+                ("counts", "Counts"), ("either", "Either")]],
+             deps=["t.n.Count", "t.n.Real", "t.n.Int", "t.n.Name", "t.n.Addr",
+                   "t.n.Flag", "t.n.Counts", "t.n.Either"]),
+    ]
+    rec = context[-1]
+    good = dict(count=1, real=2.5, int=9, name="0a0", addr="1.2.3.4",
+                flag=True, counts=[1, 2], either=6)
+    models = [good, dict(), dict(extra=1), dict(good, count=2.0),
+              dict(good, real=0), dict(good, real=10), dict(good, real=10.5),
+              dict(good, real=2.2), dict(good, int=10), dict(good, int=True),
+              dict(good, count=-1), dict(good, count="1"), dict(good, name="0"),
+              dict(good, addr="1.2.3"), dict(good, flag=1),
+              dict(good, counts=[1, -1]), dict(good, counts=["1"]),
+              dict(good, either="x"), dict(good, either=[]), [], "x", None]
+    targets = [rec] * len(models)
+    want = validate_many(models, targets, context, False, "jsonschema")
+    assert want[0] and not all(want)
+    assert validate_many(models, targets, context, False, "fastjsonschema") == want
+    assert validate_many(models, targets, context, False, "native") == want
+    assert validate_many(models, targets, context, False, "native", jobs=2) == want
+
+    # native also checks numbers fit their dtype
+    assert validate_many([dict(count=2**16)], [rec], context, False, "jsonschema") == [True]
+    assert validate_many([dict(count=2**16)], [rec], context, False, "native") == [False]
+
+    with pytest.raises(ValidationError, match="-1 is less than the minimum of 0 at /counts/1"):
+        validate(dict(good, counts=[1, -1]), rec, context, validator="native")